@@ -85,5 +85,5 @@ class BatsmanInGameTraits(TypedDict):
 class Batsman(TypedDict):
     base_traits: BatsmanBaseTraits
     in_game_traits: BatsmanInGameTraits
-    shots: Dict[ShotName, int]
+    shots: Dict[ShotName, float]
     traits: Any
\ No newline at end of file
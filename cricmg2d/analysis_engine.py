@@ -0,0 +1,65 @@
+import numpy as np
+from itertools import repeat
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from field_model import FieldModel
+from game_config import GameConfig
+from shot_cache import ShotProbabilityResult
+from _types import Aggression, Batsman, Point
+
+Delivery = Tuple[int, int, Aggression]
+
+class FieldEvaluation(NamedTuple):
+    """Coverage of one fielder set and its shot probabilities per delivery"""
+    fielders: List[Point]
+    coverage: np.ndarray
+    results: List[ShotProbabilityResult]
+
+class AnalysisEngine:
+    """Headless batch scoring of field placements, no pygame or watchdog needed"""
+
+    def __init__(self, config: GameConfig = GameConfig(), batsman: Optional[Batsman] = None):
+        self.config = config
+        self.batsman = batsman
+        self.model = FieldModel(config, batsman)
+
+    def evaluate(self, fielders: Sequence[Point], deliveries: Sequence[Delivery]) -> FieldEvaluation:
+        """Score one fielder set against every delivery"""
+        model = self.model
+        model.fielders = list(fielders)
+        model._calculate_segment_coverage()
+
+        results: List[ShotProbabilityResult] = []
+        for line, length, aggression in deliveries:
+            model.current_delivery_line = line
+            model.current_delivery_length = length
+            model.aggression_level = aggression
+            results.append(model._update_shot_probabilities())
+        return FieldEvaluation(list(fielders), model.coverage.copy(), results)
+
+    def evaluate_batch(self, fielder_sets: Sequence[Sequence[Point]], deliveries: Sequence[Delivery], processes: Optional[int] = None, chunksize: int = 16) -> List[FieldEvaluation]:
+        """Score every fielder set against every delivery
+
+        With ``processes`` above 1 the fielder sets are spread over a process
+        pool, each worker holding its own engine and probability cache.
+        """
+        if processes is None or processes <= 1:
+            return [self.evaluate(fielders, deliveries) for fielders in fielder_sets]
+
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(self.config, self.batsman)) as executor:
+            return list(executor.map(_evaluate_in_worker, fielder_sets, repeat(deliveries), chunksize=chunksize))
+
+    @staticmethod
+    def coverage_matrix(evaluations: Sequence[FieldEvaluation]) -> np.ndarray:
+        """Stack coverage vectors into a (fielder sets x segments) matrix"""
+        return np.stack([evaluation.coverage for evaluation in evaluations])
+
+_worker_engine: Optional[AnalysisEngine] = None
+
+def _init_worker(config: GameConfig, batsman: Optional[Batsman]):
+    global _worker_engine
+    _worker_engine = AnalysisEngine(config, batsman)
+
+def _evaluate_in_worker(fielders: Sequence[Point], deliveries: Sequence[Delivery]) -> FieldEvaluation:
+    assert _worker_engine is not None
+    return _worker_engine.evaluate(fielders, deliveries)
@@ -0,0 +1,312 @@
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from field_model import FieldModel
+from game_config import GameConfig
+from shot_analyzer import ShotAnalyzer
+from shot_cache import ShotProbabilityCache
+from testing_data import batsman as default_batsman
+from _types import Aggression, Batsman, Length, Line, Point, ShotName
+
+class AnalysisQuery(NamedTuple):
+    fielders: Tuple[Point, ...]
+    line: int
+    length: int
+    aggression: Aggression
+    batsman: Batsman
+
+class ServiceMetrics:
+    """Request counters and a window of recent latencies"""
+
+    def __init__(self, window: int = 10000):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.batches = 0
+        self.evaluations = 0  # vectorised score_batsmen calls
+        self.cache_hits = 0
+        self.latencies: Deque[float] = deque(maxlen=window)
+
+    def snapshot(self) -> Dict[str, float]:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        latencies = np.asarray(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        evaluated = self.requests - self.cache_hits
+        return {
+            'requests': self.requests,
+            'requests_per_second': self.requests / elapsed,
+            'cache_hits': self.cache_hits,
+            'batches': self.batches,
+            'evaluations': self.evaluations,
+            'mean_batch_size': evaluated / self.batches if self.batches else 0.0,
+            'latency_p50_ms': float(np.percentile(latencies, 50)),
+            'latency_p95_ms': float(np.percentile(latencies, 95)),
+            'latency_p99_ms': float(np.percentile(latencies, 99)),
+        }
+
+class AnalysisService:
+    """Shot and zone probabilities for many clients from one headless pipeline
+
+    Queries waiting at the same time are gathered into a batch. Queries in a
+    batch that share a field and delivery are scored together in a single
+    ShotAnalyzer.score_batsmen call. Finished answers are cached by field
+    state, so repeats skip the queue.
+    """
+
+    def __init__(self, config: GameConfig = GameConfig(), max_batch: int = 64, batch_window_ms: float = 2.0, cache_size: int = 4096):
+        self.model = FieldModel(config)
+        self.default_fielders = tuple(self.model.fielders)
+        self.max_batch = max_batch
+        self.batch_window = batch_window_ms / 1000
+        self.cache_size = cache_size
+        self.metrics = ServiceMetrics()
+        self._results: OrderedDict[bytes, Dict[str, Any]] = OrderedDict()
+        self._coverages: OrderedDict[Tuple[Point, ...], np.ndarray] = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+
+    def parse_query(self, payload: Dict[str, Any]) -> AnalysisQuery:
+        """Build a query from JSON, filling in the game's defaults for anything left out
+
+        Raises KeyError, TypeError or ValueError for input that cannot be scored,
+        so it is rejected before joining a batch.
+        """
+        fielders = payload.get('fielders')
+        return AnalysisQuery(
+            fielders=tuple((float(x), float(y)) for x, y in fielders) if fielders else self.default_fielders,
+            line=int(Line(int(payload.get('line', 4)))),
+            length=int(Length(int(payload.get('length', 5)))),
+            aggression=Aggression[payload.get('aggression', Aggression.NEUTRAL.name)],
+            batsman=self.parse_batsman(payload['batsman']) if 'batsman' in payload else default_batsman
+        )
+
+    @staticmethod
+    def parse_batsman(record: Dict[str, Any]) -> Batsman:
+        """Same layout as a Roster JSON record, with enums given by name
+
+        Traits and ratings are coerced to numbers like Roster.batsman does.
+        """
+        base, in_game = record['base_traits'], record['in_game_traits']
+        return {
+            'base_traits': {name: int(base[name]) for name in ('timing', 'judgement', 'stamina')},
+            'in_game_traits': {
+                'fatigue': int(in_game['fatigue']),
+                'confidence': int(in_game['confidence']),
+                'aggression': Aggression[in_game['aggression']]
+            },
+            'shots': {ShotName[name]: float(rating) for name, rating in record['shots'].items()},
+            'traits': record.get('traits', {})
+        }
+
+    def _coverage(self, fielders: Tuple[Point, ...]) -> np.ndarray:
+        coverage = self._coverages.get(fielders)
+        if coverage is None:
+            self.model.fielders = list(fielders)
+            self.model._calculate_segment_coverage()
+            coverage = self.model.shot_coverage.copy()
+            self._coverages[fielders] = coverage
+            while len(self._coverages) > self.cache_size:
+                self._coverages.popitem(last=False)
+        return coverage
+
+    def _result_key(self, query: AnalysisQuery) -> bytes:
+        return ShotProbabilityCache.make_key(self._coverage(query.fielders), query.line, query.length, query.aggression, query.batsman)
+
+    async def query(self, query: AnalysisQuery) -> Dict[str, Any]:
+        """Answer one query, waiting for the batch it joins if it is not cached"""
+        start = time.perf_counter()
+        self.metrics.requests += 1
+        key = self._result_key(query)
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            self.metrics.cache_hits += 1
+        else:
+            self._ensure_batcher()
+            assert self._queue is not None
+            future = asyncio.get_running_loop().create_future()
+            await self._queue.put((key, query, future))
+            result = await future
+        self.metrics.latencies.append(time.perf_counter() - start)
+        return result
+
+    def _ensure_batcher(self):
+        if self._batcher is None or self._batcher.done():
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._run_batches())
+
+    async def _run_batches(self):
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                results = self._evaluate([(key, query) for key, query, _ in batch])
+            except Exception:
+                # Score the queries one by one so only the one that failed sees the error
+                results = {}
+                for key, query, future in batch:
+                    try:
+                        results.update(self._evaluate([(key, query)]))
+                    except Exception as error:
+                        if not future.done():
+                            future.set_exception(error)
+            for key, _, future in batch:
+                if not future.done():
+                    future.set_result(results[key])
+
+    def _evaluate(self, batch: Sequence[Tuple[bytes, AnalysisQuery]]) -> Dict[bytes, Dict[str, Any]]:
+        """Score a batch, one vectorised call per distinct field and delivery"""
+        self.metrics.batches += 1
+        groups: Dict[Tuple[bytes, int, int, Aggression], List[Tuple[bytes, AnalysisQuery]]] = {}
+        for key, query in batch:
+            coverage_key = self._coverage(query.fielders).tobytes()
+            groups.setdefault((coverage_key, query.line, query.length, query.aggression), []).append((key, query))
+
+        grid = self.model.grid
+        results: Dict[bytes, Dict[str, Any]] = {}
+        for (_, line, length, aggression), members in groups.items():
+            # Identical queries in a batch are scored once
+            unique = list({key: query for key, query in members}.items())
+            ratings = np.array([ShotAnalyzer.rating_vector(query.batsman) for _, query in unique])
+            judgement = np.array([query.batsman['base_traits']['judgement'] for _, query in unique], dtype=float)
+            coverage = self._coverage(unique[0][1].fielders)
+            probabilities, shot_names = ShotAnalyzer.score_batsmen(grid, coverage, line, length, aggression, ratings, judgement)
+            self.metrics.evaluations += 1
+
+            for (key, _), row in zip(unique, probabilities):
+                results[key] = {
+                    'shot_probabilities': ShotAnalyzer.probabilities_to_dict(grid, row, shot_names),
+                    'zones_probabilities': ShotAnalyzer.zone_probabilities(grid, row, shot_names)
+                }
+
+        for key, result in results.items():
+            self._results[key] = result
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+        return results
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Minimal HTTP/1.1 with keep-alive: POST /probabilities and GET /metrics"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(' ', 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode().partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                status, response = await self._route(method, path, body)
+                payload = json.dumps(response).encode()
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[str, Any]:
+        if method == 'GET' and path == '/metrics':
+            return "200 OK", self.metrics.snapshot()
+        if method == 'POST' and path == '/probabilities':
+            try:
+                payload = json.loads(body or b'{}')
+                if not isinstance(payload, dict):
+                    return "400 Bad Request", {'error': "Expected a JSON object"}
+                query = self.parse_query(payload)
+            except (KeyError, TypeError, ValueError) as error:
+                return "400 Bad Request", {'error': repr(error)}
+            try:
+                return "200 OK", await self.query(query)
+            except Exception as error:
+                return "500 Internal Server Error", {'error': repr(error)}
+        return "404 Not Found", {'error': f"No route for {method} {path}"}
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765, unix_path: Optional[str] = None) -> asyncio.AbstractServer:
+        if unix_path is not None:
+            return await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+async def post(host: str, port: int, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """One-shot HTTP client for trying the service from scripts or a notebook"""
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload).encode() if payload is not None else b''
+    method = 'POST' if payload is not None else 'GET'
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b'\r\n\r\n', 1)[1])
+
+async def _load_test(service: AnalysisService, host: str, port: int, requests: int, concurrency: int, seed: int):
+    """Fire random queries from concurrent clients and print the service metrics"""
+    server = await service.start(host, port)
+    rng = np.random.default_rng(seed)
+    queries = [
+        {
+            'fielders': [list(fielder) for fielder in service.default_fielders[:-1]] + [[float(rng.integers(500, 900)), 600.0]],
+            'line': int(rng.integers(1, 8)),
+            'length': int(rng.integers(1, 8)),
+            'aggression': Aggression(int(rng.integers(1, 6))).name
+        }
+        for _ in range(requests)
+    ]
+
+    async def client(chunk: List[Dict[str, Any]]):
+        for payload in chunk:
+            await post(host, port, '/probabilities', payload)
+
+    await asyncio.gather(*(client(queries[i::concurrency]) for i in range(concurrency)))
+    print(json.dumps(await post(host, port, '/metrics'), indent=2))
+    server.close()
+    await server.wait_closed()
+
+async def _serve(service: AnalysisService, host: str, port: int, unix_path: Optional[str]):
+    server = await service.start(host, port, unix_path)
+    print(f"Serving on {unix_path or f'http://{host}:{port}'}")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local shot probability service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="serve on a Unix socket at this path instead of TCP")
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--batch-window-ms', type=float, default=2.0)
+    parser.add_argument('--load-test', type=int, metavar='REQUESTS', help="run this many requests against an in-process server and exit")
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+
+    service = AnalysisService(max_batch=args.max_batch, batch_window_ms=args.batch_window_ms)
+    if args.load_test:
+        asyncio.run(_load_test(service, args.host, args.port, args.load_test, args.concurrency, seed=0))
+    else:
+        asyncio.run(_serve(service, args.host, args.port, args.unix))
+
+
+if __name__ == "__main__":
+    main()
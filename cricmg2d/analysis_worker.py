@@ -0,0 +1,116 @@
+import threading
+import numpy as np
+from typing import Callable, List, NamedTuple, Optional
+from field_model import FieldModel
+from game_config import GameConfig
+from shot_cache import ShotProbabilityResult
+from _types import Aggression, Batsman, Point
+
+class AnalysisRequest(NamedTuple):
+    version: int
+    fielders: List[Point]
+    line: int
+    length: int
+    aggression: Aggression
+    batsman: Batsman
+
+class AnalysisResult(NamedTuple):
+    """Everything the UI needs to swap in for one request, built off the UI thread"""
+    version: int
+    fielders: List[Point]
+    fielder_coverage: np.ndarray
+    fielder_interception: Optional[np.ndarray]
+    probabilities: ShotProbabilityResult
+    line: int
+    length: int
+    aggression: Aggression
+    batsman: Batsman
+
+class StaleRequest(Exception):
+    """Raised inside the worker when a newer request makes the current one pointless"""
+
+class AnalysisWorker:
+    """Recomputes coverage and shot probabilities on a background thread
+
+    Only the newest request matters: submitting replaces any request still
+    waiting, and a request already running is abandoned at the next phase
+    boundary once a newer one arrives. The worker owns a private FieldModel,
+    so nothing it touches is shared with the UI; finished results go to
+    on_done, called on the worker thread.
+    """
+
+    def __init__(self, config: GameConfig, on_done: Callable[[AnalysisResult], None], start_version: int = 0):
+        self.model = FieldModel(config)
+        self.on_done = on_done
+        self.latest_version = start_version
+        self.cancelled = 0
+        self._pending: Optional[AnalysisRequest] = None
+        self._condition = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="analysis-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, fielders: List[Point], line: int, length: int, aggression: Aggression, batsman: Batsman) -> int:
+        """Queue a recomputation and return its version"""
+        with self._condition:
+            self.latest_version += 1
+            if self._pending is not None:
+                self.cancelled += 1
+            self._pending = AnalysisRequest(self.latest_version, list(fielders), line, length, aggression, batsman)
+            self._condition.notify()
+            return self.latest_version
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and self._pending is None:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                request, self._pending = self._pending, None
+            try:
+                result = self._compute(request)
+            except StaleRequest:
+                self.cancelled += 1
+                continue
+            self.on_done(result)
+
+    def _check(self, request: AnalysisRequest):
+        if request.version != self.latest_version:
+            raise StaleRequest()
+
+    def _compute(self, request: AnalysisRequest) -> AnalysisResult:
+        model = self.model
+        moved = [i for i, (old, new) in enumerate(zip(model.fielders, request.fielders)) if old != new]
+        if len(model.fielders) != len(request.fielders) or len(moved) > 1:
+            model.fielders = list(request.fielders)
+            model._calculate_segment_coverage()
+        elif moved:
+            # The usual case is a single dragged fielder, which only needs their own row
+            model._move_fielder(moved[0], request.fielders[moved[0]])
+        self._check(request)
+
+        model.current_delivery_line = request.line
+        model.current_delivery_length = request.length
+        model.aggression_level = request.aggression
+        model.batsman = request.batsman
+        probabilities = model._update_shot_probabilities()
+        self._check(request)
+
+        return AnalysisResult(
+            request.version,
+            list(model.fielders),
+            model.fielder_coverage.copy(),
+            model.fielder_interception.copy() if model.fielder_interception is not None else None,
+            probabilities,
+            request.line,
+            request.length,
+            request.aggression,
+            request.batsman
+        )
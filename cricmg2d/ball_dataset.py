@@ -0,0 +1,289 @@
+import argparse
+import csv
+import json
+import os
+import numpy as np
+from collections import deque
+from itertools import islice
+from typing import Any, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from field_model import FieldModel
+from game_config import GameConfig
+from _types import Aggression, Batsman, Length, Line, Point
+
+Ball = Dict[str, Any]
+
+# Reliability diagram resolution for the calibration summary
+CALIBRATION_BINS = 10
+
+class ChunkResult(NamedTuple):
+    rows: List[List[Any]]  # one prediction row per ball, in input order
+    bin_counts: np.ndarray  # (bins,) zone predictions per probability bin
+    bin_predicted: np.ndarray  # (bins,) summed predicted probability
+    bin_observed: np.ndarray  # (bins,) how many of those zones were hit
+    log_loss: float
+    brier: float
+    hits: int  # balls whose most likely zone was the actual one
+    balls: int
+    skipped: int  # rows that could not be evaluated
+
+class Calibration:
+    """Running calibration totals, a fixed handful of numbers however many balls pass"""
+
+    def __init__(self):
+        self.bin_counts = np.zeros(CALIBRATION_BINS)
+        self.bin_predicted = np.zeros(CALIBRATION_BINS)
+        self.bin_observed = np.zeros(CALIBRATION_BINS)
+        self.log_loss = 0.0
+        self.brier = 0.0
+        self.hits = 0
+        self.balls = 0
+        self.skipped = 0
+
+    def add(self, chunk: ChunkResult):
+        self.bin_counts += chunk.bin_counts
+        self.bin_predicted += chunk.bin_predicted
+        self.bin_observed += chunk.bin_observed
+        self.log_loss += chunk.log_loss
+        self.brier += chunk.brier
+        self.hits += chunk.hits
+        self.balls += chunk.balls
+        self.skipped += chunk.skipped
+
+    def summary(self) -> Dict[str, Any]:
+        balls = max(self.balls, 1)
+        counts = np.maximum(self.bin_counts, 1)
+        return {
+            'balls': self.balls,
+            'skipped': self.skipped,
+            'log_loss': self.log_loss / balls,
+            'brier': self.brier / balls,
+            'top_zone_accuracy': self.hits / balls,
+            'bins': [
+                {
+                    'low': i / CALIBRATION_BINS,
+                    'high': (i + 1) / CALIBRATION_BINS,
+                    'count': int(self.bin_counts[i]),
+                    'mean_predicted': float(self.bin_predicted[i] / counts[i]),
+                    'observed_rate': float(self.bin_observed[i] / counts[i])
+                }
+                for i in range(CALIBRATION_BINS)
+            ]
+        }
+
+def read_balls(path: str) -> Iterator[Ball]:
+    """Yield balls one at a time from a .csv or .jsonl log
+
+    CSV cells holding fielders are JSON lists of [x, y] pairs, decoded when
+    the ball is evaluated so a malformed one only skips that ball.
+    """
+    with open(path, newline='') as handle:
+        if path.endswith('.jsonl'):
+            for line in handle:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        yield {}  # evaluated as an invalid ball and skipped
+        else:
+            yield from csv.DictReader(handle)
+
+def chunked(balls: Iterator[Ball], size: int) -> Iterator[List[Ball]]:
+    while True:
+        chunk = list(islice(balls, size))
+        if not chunk:
+            return
+        yield chunk
+
+class ParsedBall(NamedTuple):
+    fielders: Tuple[Point, ...]
+    line: Line
+    length: Length
+    aggression: Aggression
+    batsman: Batsman
+    actual: Optional[int]
+
+def _aggression(value: Any) -> Aggression:
+    if value in (None, ''):
+        return Aggression.NEUTRAL
+    return Aggression(int(value)) if str(value).isdigit() else Aggression[str(value)]
+
+class BallEvaluator:
+    """Predicts each ball's zone distribution and scores it against the actual zone"""
+
+    def __init__(self, config: GameConfig, roster_path: Optional[str] = None):
+        self.model = FieldModel(config)
+        self.default_batsman = self.model.batsman
+        self.default_fielders = list(self.model.fielders)
+        self.roster = None
+        if roster_path:
+            from roster import Roster
+            self.roster = Roster.open(roster_path)
+
+    def actual_zone(self, ball: Ball) -> Optional[int]:
+        if ball.get('zone') not in (None, ''):
+            zone = int(ball['zone'])
+            if not 0 <= zone < self.model.grid.zone_slots:
+                raise ValueError(f"Zone {zone} is outside the grid")
+            return zone
+        if ball.get('segment'):
+            index = self.model.grid.parse_id(str(ball['segment']))
+            return int(self.model.grid.zone_of[index]) if index is not None else None
+        return None
+
+    def parse(self, ball: Ball) -> ParsedBall:
+        """Validate one ball, raising KeyError, TypeError or ValueError if it cannot be scored"""
+        if not isinstance(ball, dict):
+            raise TypeError(f"Expected a ball record, got {type(ball).__name__}")
+        fielders = ball.get('fielders') or self.default_fielders
+        if isinstance(fielders, str):
+            fielders = json.loads(fielders)
+        name = ball.get('batsman')
+        if self.roster is not None and name:
+            batsman = self.roster.batsman(self.roster.index_of(name))
+        else:
+            batsman = self.default_batsman
+        return ParsedBall(
+            tuple((float(x), float(y)) for x, y in fielders),
+            Line(int(ball['line'])),
+            Length(int(ball['length'])),
+            _aggression(ball.get('aggression')),
+            batsman,
+            self.actual_zone(ball)
+        )
+
+    def evaluate(self, first_index: int, balls: List[Ball]) -> ChunkResult:
+        grid = self.model.grid
+        zone_slots = grid.zone_slots
+        rows: List[Optional[List[Any]]] = [None] * len(balls)
+        bin_counts = np.zeros(CALIBRATION_BINS)
+        bin_predicted = np.zeros(CALIBRATION_BINS)
+        bin_observed = np.zeros(CALIBRATION_BINS)
+        log_loss = brier = 0.0
+        hits = scored = skipped = 0
+
+        # One bad row is counted and skipped rather than ending the stream
+        parsed: Dict[int, ParsedBall] = {}
+        for i, ball in enumerate(balls):
+            try:
+                parsed[i] = self.parse(ball)
+            except (KeyError, TypeError, ValueError):
+                skipped += 1
+
+        # Balls bowled to the same field share one coverage computation
+        groups: Dict[Tuple[Point, ...], List[int]] = {}
+        for i, ball_fields in parsed.items():
+            groups.setdefault(ball_fields.fielders, []).append(i)
+
+        for fielders, members in groups.items():
+            self.model.fielders = list(fielders)
+            self.model._calculate_segment_coverage()
+            for i in members:
+                ball_fields = parsed[i]
+                self.model.current_delivery_line = ball_fields.line
+                self.model.current_delivery_length = ball_fields.length
+                self.model.aggression_level = ball_fields.aggression
+                self.model.batsman = ball_fields.batsman
+                self.model._update_shot_probabilities()
+
+                predicted = np.zeros(zone_slots)
+                for zone, probability in self.model.zones_probabilities.items():
+                    predicted[int(zone)] = probability
+                top_zone = int(predicted.argmax())
+                actual = ball_fields.actual
+
+                row: List[Any] = [first_index + i, top_zone, f"{predicted[top_zone]:.6f}"]
+                if actual is not None:
+                    observed = np.zeros(zone_slots)
+                    observed[actual] = 1
+                    bins = np.minimum((predicted * CALIBRATION_BINS).astype(int), CALIBRATION_BINS - 1)
+                    bin_counts += np.bincount(bins, minlength=CALIBRATION_BINS)
+                    bin_predicted += np.bincount(bins, weights=predicted, minlength=CALIBRATION_BINS)
+                    bin_observed += np.bincount(bins, weights=observed, minlength=CALIBRATION_BINS)
+                    log_loss -= float(np.log(max(predicted[actual], 1e-12)))
+                    brier += float(((predicted - observed) ** 2).sum())
+                    hits += int(top_zone == actual)
+                    scored += 1
+                    row += [actual, f"{predicted[actual]:.6f}"]
+                else:
+                    row += ['', '']
+                rows[i] = row + [f"{p:.6f}" for p in predicted]
+
+        return ChunkResult([row for row in rows if row is not None], bin_counts, bin_predicted, bin_observed, log_loss, brier, hits, scored, skipped)
+
+_worker_evaluator: Optional[BallEvaluator] = None
+
+def _init_worker(config: GameConfig, roster_path: Optional[str]):
+    global _worker_evaluator
+    _worker_evaluator = BallEvaluator(config, roster_path)
+
+def _evaluate_in_worker(first_index: int, balls: List[Ball]) -> ChunkResult:
+    assert _worker_evaluator is not None
+    return _worker_evaluator.evaluate(first_index, balls)
+
+def evaluate_stream(path: str, config: GameConfig = GameConfig(), roster_path: Optional[str] = None, chunk_size: int = 5000, processes: Optional[int] = None) -> Iterator[ChunkResult]:
+    """Chunk results in input order, with at most a few chunks in memory at once"""
+    chunks = chunked(read_balls(path), chunk_size)
+    if processes is None or processes <= 1:
+        evaluator = BallEvaluator(config, roster_path)
+        first_index = 0
+        for chunk in chunks:
+            yield evaluator.evaluate(first_index, chunk)
+            first_index += len(chunk)
+        return
+
+    from concurrent.futures import Future, ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(config, roster_path)) as executor:
+        # Bounded look-ahead: reading stops while 2 chunks per process are in flight
+        in_flight: Deque[Future] = deque()
+        first_index = 0
+        for chunk in chunks:
+            in_flight.append(executor.submit(_evaluate_in_worker, first_index, chunk))
+            first_index += len(chunk)
+            if len(in_flight) >= 2 * processes:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+def _write_summary(calibration: Calibration, path: str):
+    # Replace the file whole, so a reader never sees a half-written summary
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as handle:
+        json.dump(calibration.summary(), handle, indent=2)
+    os.replace(temporary, path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a ball-by-ball log against the shot model")
+    parser.add_argument('log', help=".csv or .jsonl with line, length, aggression, fielders, batsman and zone or segment")
+    parser.add_argument('--predictions', default='predictions.csv')
+    parser.add_argument('--calibration', default='calibration.json')
+    parser.add_argument('--roster', help="roster to look batsman names up in")
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    config = GameConfig()
+    zone_slots = FieldModel(config).grid.zone_slots
+    calibration = Calibration()
+    processed = 0
+    with open(args.predictions, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(
+            ['ball', 'predicted_zone', 'predicted_probability', 'actual_zone', 'actual_probability']
+            + [f"zone_{zone}" for zone in range(zone_slots)]
+        )
+        for chunk in evaluate_stream(args.log, config, args.roster, args.chunk_size, args.processes):
+            writer.writerows(chunk.rows)
+            handle.flush()
+            calibration.add(chunk)
+            _write_summary(calibration, args.calibration)
+            processed += len(chunk.rows)
+            print(f"{processed} balls processed")
+
+    summary = calibration.summary()
+    if summary['skipped']:
+        print(f"Skipped {summary['skipped']} invalid balls")
+    print(f"Log loss {summary['log_loss']:.4f}, Brier {summary['brier']:.4f}, top zone accuracy {summary['top_zone_accuracy']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
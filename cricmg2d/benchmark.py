@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Render offscreen; must be set before pygame is imported
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from game_config import GameConfig
+from segments import BASE_WEDGES, BASE_ZONES
+from shot_analyzer import ShotAnalyzer
+from _types import Aggression, Length, Line, Point
+
+# Wedges x zones; the first is the default field
+RESOLUTIONS: List[Tuple[int, int]] = [(18, 7), (36, 14), (72, 28)]
+PERCENTILES = (50, 90, 99)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+Timings = Dict[str, List[float]]
+Report = Dict[str, Dict[str, float]]
+
+def random_layout(model, rng: np.random.Generator, count: int) -> List[Point]:
+    """Fielders placed uniformly inside the boundary ellipse"""
+    layout: List[Point] = []
+    while len(layout) < count:
+        position = (
+            float(rng.uniform(model.ellipse_cx - model.ellipse_rx, model.ellipse_cx + model.ellipse_rx)),
+            float(rng.uniform(model.ellipse_cy - model.ellipse_ry, model.ellipse_cy + model.ellipse_ry))
+        )
+        if model._inside_field(position):
+            layout.append(position)
+    return layout
+
+def timed(timings: Timings, name: str, operation: Callable[[], object]):
+    start = time.perf_counter()
+    operation()
+    timings.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+def run_resolution(num_wedges: int, num_zones: int, layouts: int, seed: int) -> Timings:
+    """Time every operation for one grid resolution over random layouts and all deliveries"""
+    from cricket_field import CricketField
+
+    field = CricketField(GameConfig(num_wedges=num_wedges, num_zones=num_zones))
+    rng = np.random.default_rng(seed)
+    base_grid = (num_wedges, num_zones) == (BASE_WEDGES, BASE_ZONES)
+    timings: Timings = {}
+
+    # Render the static layer once so frames measure steady-state redraws
+    field._draw()
+    for _ in range(layouts):
+        field.fielders = random_layout(field, rng, len(field.fielders))
+        timed(timings, 'coverage', field._calculate_segment_coverage)
+
+        for aggression in Aggression:
+            field.aggression_level = aggression
+            for line in Line:
+                for length in Length:
+                    field.current_delivery_line = line
+                    field.current_delivery_length = length
+                    timed(timings, 'shot_pipeline', field._compute_shot_probabilities)
+
+                    # The dict API only understands the base grid's segment ids
+                    if base_grid:
+                        timed(timings, 'legacy_shot_pipeline', lambda: ShotAnalyzer.calculate_potential_shot_probabilities(
+                            ShotAnalyzer.adjust_potential_shots(
+                                ShotAnalyzer.find_potential_shots(field.segments, line, length, field.batsman),
+                                aggression
+                            )
+                        ))
+
+        field._update_shot_probabilities()
+        timed(timings, 'frame', field._draw)
+    return timings
+
+def summarise(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples)
+    summary = {f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}
+    summary['count'] = float(values.size)
+    return summary
+
+def compare(report: Report, baseline: Report, tolerance: float, floor_ms: float) -> List[str]:
+    """Operations whose median got slower than the baseline allows"""
+    regressions: List[str] = []
+    for name, summary in report.items():
+        if name not in baseline:
+            continue
+        allowed = baseline[name]['p50'] * tolerance
+        if summary['p50'] > allowed and summary['p50'] - baseline[name]['p50'] > floor_ms:
+            regressions.append(f"{name}: p50 {summary['p50']:.3f} ms vs baseline {baseline[name]['p50']:.3f} ms")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Headless latency benchmarks for the analysis and rendering pipeline")
+    parser.add_argument('--layouts', type=int, default=10, help="random fielder layouts per resolution")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the baseline instead of comparing")
+    parser.add_argument('--tolerance', type=float, default=1.5, help="allowed p50 slowdown factor")
+    parser.add_argument('--floor-ms', type=float, default=0.05, help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    report: Report = {}
+    for num_wedges, num_zones in RESOLUTIONS:
+        for name, samples in run_resolution(num_wedges, num_zones, args.layouts, args.seed).items():
+            report[f"{num_wedges}x{num_zones}/{name}"] = summarise(samples)
+
+    print(f"{'operation':<32}" + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES) + f"{'n':>8}")
+    for name, summary in report.items():
+        print(f"{name:<32}" + "".join(f"{summary[f'p{p}']:>10.3f}" for p in PERCENTILES) + f"{int(summary['count']):>8}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to store one")
+        return 0
+
+    with open(args.baseline) as handle:
+        baseline: Report = json.load(handle)
+    regressions = compare(report, baseline, args.tolerance, args.floor_ms)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
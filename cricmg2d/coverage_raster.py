@@ -0,0 +1,130 @@
+import math
+import numpy as np
+from typing import List, Optional, Tuple
+from game_config import GameConfig
+from _types import Point
+
+class CoverageRaster:
+    """Integer grid over the field area counting the fielders that reach each cell
+
+    Each fielder stamps its coverage disc into ``counts``. A summed-area table
+    is kept alongside, so point and rectangle queries are O(1). Moving a
+    fielder unstamps and restamps only that fielder's disc, and patches only
+    the part of the table below and to the right of it.
+    """
+
+    def __init__(self, config: GameConfig = GameConfig(), cell_size: float = 2):
+        self.origin_x = config.field_x
+        self.origin_y = config.field_y
+        self.cell_size = cell_size
+        self.rows = int(math.ceil(config.field_height / cell_size))
+        self.cols = int(math.ceil(config.field_width / cell_size))
+
+        self.counts = np.zeros((self.rows, self.cols), dtype=np.int32)
+        self.table = np.zeros((self.rows + 1, self.cols + 1), dtype=np.int64)
+        self.discs: List[Optional[Tuple[Point, float]]] = []
+
+        # Cell centres, used to test which cells a disc reaches
+        self.cell_x = self.origin_x + (np.arange(self.cols) + 0.5) * cell_size
+        self.cell_y = self.origin_y + (np.arange(self.rows) + 0.5) * cell_size
+
+    def build(self, centers: List[Point], radii: List[float]):
+        """Stamp every fielder's disc from scratch"""
+        self.counts[:] = 0
+        self.table[:] = 0
+        self.discs = []
+        for center, radius in zip(centers, radii):
+            self.discs.append((center, radius))
+            self._stamp(center, radius, 1)
+
+    def move(self, index: int, center: Point, radius: float):
+        """Move one fielder's disc, updating counts and the table incrementally"""
+        old = self.discs[index]
+        if old is not None:
+            self._stamp(old[0], old[1], -1)
+        self.discs[index] = (center, radius)
+        self._stamp(center, radius, 1)
+
+    def _stamp(self, center: Point, radius: float, sign: int):
+        row_range = self._span(center[1] - radius, center[1] + radius, self.origin_y, self.rows)
+        col_range = self._span(center[0] - radius, center[0] + radius, self.origin_x, self.cols)
+        if row_range is None or col_range is None:
+            return
+        (r0, r1), (c0, c1) = row_range, col_range
+
+        dy = self.cell_y[r0:r1, None] - center[1]
+        dx = self.cell_x[None, c0:c1] - center[0]
+        delta = (dx * dx + dy * dy <= radius * radius).astype(np.int64) * sign
+        self.counts[r0:r1, c0:c1] += delta.astype(np.int32)
+
+        # The delta's prefix sums spread to every table entry below and right of it
+        partial = delta.cumsum(axis=0).cumsum(axis=1)
+        self.table[r0 + 1:r1 + 1, c0 + 1:c1 + 1] += partial
+        self.table[r1 + 1:, c0 + 1:c1 + 1] += partial[-1, :]
+        self.table[r0 + 1:r1 + 1, c1 + 1:] += partial[:, -1:]
+        self.table[r1 + 1:, c1 + 1:] += partial[-1, -1]
+
+    def _span(self, low: float, high: float, origin: float, limit: int) -> Optional[Tuple[int, int]]:
+        start = max(0, int(math.floor((low - origin) / self.cell_size)))
+        end = min(limit, int(math.ceil((high - origin) / self.cell_size)))
+        return (start, end) if start < end else None
+
+    def _cell(self, point: Point) -> Optional[Tuple[int, int]]:
+        row = int((point[1] - self.origin_y) // self.cell_size)
+        col = int((point[0] - self.origin_x) // self.cell_size)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def at(self, point: Point) -> int:
+        """Number of fielders covering a point, 0 outside the field area"""
+        cell = self._cell(point)
+        return int(self.counts[cell]) if cell is not None else 0
+
+    def rect_sum(self, x0: float, y0: float, x1: float, y1: float) -> int:
+        """Summed coverage over the cells of a screen-space rectangle"""
+        rows = self._span(y0, y1, self.origin_y, self.rows)
+        cols = self._span(x0, x1, self.origin_x, self.cols)
+        if rows is None or cols is None:
+            return 0
+        (r0, r1), (c0, c1) = rows, cols
+        table = self.table
+        return int(table[r1, c1] - table[r0, c1] - table[r1, c0] + table[r0, c0])
+
+    def rect_mean(self, x0: float, y0: float, x1: float, y1: float) -> float:
+        rows = self._span(y0, y1, self.origin_y, self.rows)
+        cols = self._span(x0, x1, self.origin_x, self.cols)
+        if rows is None or cols is None:
+            return 0.0
+        cells = (rows[1] - rows[0]) * (cols[1] - cols[0])
+        return self.rect_sum(x0, y0, x1, y1) / cells
+
+    def polygon_spans(self, polygon: List[Point]) -> np.ndarray:
+        """Row spans (row, first col, end col) of the cells whose centres lie in a convex polygon"""
+        poly = np.asarray(polygon, dtype=float)
+        rows = self._span(poly[:, 1].min(), poly[:, 1].max(), self.origin_y, self.rows)
+        if rows is None:
+            return np.zeros((0, 3), dtype=np.intp)
+
+        spans = []
+        starts, ends = poly, np.roll(poly, -1, axis=0)
+        for row in range(*rows):
+            y = self.cell_y[row]
+            crossing = (starts[:, 1] <= y) != (ends[:, 1] <= y)
+            if crossing.sum() < 2:
+                continue
+            s, e = starts[crossing], ends[crossing]
+            xs = s[:, 0] + (y - s[:, 1]) * (e[:, 0] - s[:, 0]) / (e[:, 1] - s[:, 1])
+            c0 = max(0, int(math.ceil((xs.min() - self.origin_x) / self.cell_size - 0.5)))
+            c1 = min(self.cols, int(math.floor((xs.max() - self.origin_x) / self.cell_size - 0.5)) + 1)
+            if c0 < c1:
+                spans.append((row, c0, c1))
+        return np.array(spans, dtype=np.intp).reshape(-1, 3)
+
+    def spans_sum(self, spans: np.ndarray) -> int:
+        """Summed coverage over precomputed row spans, O(1) per span"""
+        if len(spans) == 0:
+            return 0
+        rows, c0, c1 = spans[:, 0], spans[:, 1], spans[:, 2]
+        table = self.table
+        return int((table[rows + 1, c1] - table[rows, c1] - table[rows + 1, c0] + table[rows, c0]).sum())
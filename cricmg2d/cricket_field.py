@@ -1,20 +1,39 @@
 import sys
 import math
+import os
+import tempfile
+import threading
 import pygame
-from typing import List, Tuple, Dict
+import numpy as np
+from dataclasses import astuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+import hot_reload
 from watchdog_config import watch_for_changes, restart_program
 from game_config import GameConfig
-from geometry import GeometryUtils
+from field_model import FieldModel
 from shot_analyzer import ShotAnalyzer
-from testing_data import batsman
-from _types import Aggression, Point, RgbColor, RgbaColor, Segment
-
-class CricketField:
+from shot_cache import ShotProbabilityCache, ShotProbabilityResult
+from _types import Aggression, Point, RgbColor, RgbaColor
+
+# Traced alongside every _draw* method when tracing is on
+TRACED_METHODS = (
+    '_present', '_handle_events', '_calculate_segment_coverage', '_move_fielder',
+    '_update_shot_probabilities', '_rebuild_probability_panels'
+)
+
+# Optional features are imported on first use to keep startup fast
+if TYPE_CHECKING:
+    from analysis_worker import AnalysisResult, AnalysisWorker
+    from delivery_heatmap import DeliveryHeatmap
+    from frame_tracer import FrameTracer
+    from roster import Roster
+
+class CricketField(FieldModel):
     """Main class for cricket field simulation"""
     
     def __init__(self, config: GameConfig = GameConfig()):
-        # Store configuration
-        self.config = config
+        # Field geometry, coverage and initial shot probabilities
+        super().__init__(config)
         
         # Colors
         self.colors: Dict[str, RgbColor | RgbaColor] = {
@@ -34,14 +53,24 @@ class CricketField:
         self.zones_enabled = True
         self.inner_circle_enabled = True
         self.fielder_coverage_enabled = False
+        self.heatmap_enabled = False
 
-        # Watchdog settings
-        self.observer, self.event_handler = watch_for_changes()
+        # Watchdog settings, started by run() so one-off constructions skip it
+        self.observer = None
+        self.event_handler = None
      
+        # Squad to switch batsmen from
+        self.roster: Optional['Roster'] = None
+        if config.roster_path:
+            import roster
+            self.roster = roster.Roster.open(config.roster_path)
+        self.roster_index = -1
+
+        # Redraw state
+        self.full_redraw = True
+        self.dirty_rects: List[pygame.Rect] = []
+
         # Game state
-        self.current_delivery_line = 4
-        self.current_delivery_length = 5
-        self.aggression_level = Aggression.NEUTRAL
         self.selected_wedge = 0
         self.selected_fielder = None
         self.offset_x = 0
@@ -53,19 +82,25 @@ class CricketField:
         pygame.font.init()
         self.screen = pygame.display.set_mode((config.width, config.height))
         pygame.display.set_caption("Cricket Field")
-        self.font = pygame.font.SysFont('Arial', 10)
+        self.fonts: Dict[int, pygame.font.Font] = {size: pygame.font.SysFont('Arial', size) for size in (10, 12, 13, 14)}
+        self.font = self.fonts[10]
+        self.text_cache: Dict[Tuple[int, str, RgbColor | RgbaColor], pygame.Surface] = {}
+        self.text_cache_limit = 1024
+
+        # Probability panels, rebuilt only when the probabilities change
+        self.zone_panel_rect = pygame.Rect(10, 50, 120, 280)
+        self.segment_panel_rect = pygame.Rect(1270, 10, 120, 400)
+        self.panels_dirty = True
+        self.heatmap_panel_rect = pygame.Rect(10, 340, 120, 150)
+        self.delivery_heatmap: Optional['DeliveryHeatmap'] = None
         
         # Create surfaces
+        self.static_layer = pygame.Surface((config.width, config.height)).convert()
+        self.static_layer_key = None
         self.highlight_surface = pygame.Surface((config.width, config.height), pygame.SRCALPHA)
+        self.highlight_version = None
         self.coverage_surface = pygame.Surface((config.width, config.height), pygame.SRCALPHA)
         
-        # Field elements
-        self.batsman_pos = (700, 360)
-        self.ellipse_cx = 700
-        self.ellipse_cy = 400
-        self.ellipse_rx = 240
-        self.ellipse_ry = 240
-        
         # Input handling
         self.input_active = {"line": False, "length": False}
         self.input_text = {"line": str(self.current_delivery_line), "length": str(self.current_delivery_length)}
@@ -77,132 +112,46 @@ class CricketField:
             "line": pygame.Color('lightskyblue3'),
             "length": pygame.Color('lightskyblue3')
         }
-        
-        # Initialize field segments
-        self._init_field_elements()
-        self._calculate_segment_coverage()
-        
-        # Calculate initial shot probabilities
-        self._update_shot_probabilities()
-
-    def _init_field_elements(self):
-        """Initialize field elements, segments, and fielders"""
-        # Calculate wedge angles
-        self.wedge_angles = [i * 360/self.config.num_wedges for i in range(self.config.num_wedges)]
-        
-        # Calculate radial lines
-        self.radial_lines: List[Tuple[Point, Point]] = []
-        for angle in self.wedge_angles:
-            rad = math.radians(angle)
-            dx, dy = math.cos(rad), math.sin(rad)
-
-            # Solve for ellipse intersection
-            denom = math.sqrt((dx*dx)/(self.ellipse_rx*self.ellipse_rx) +
-                            (dy*dy)/(self.ellipse_ry*self.ellipse_ry))
-            t = 1.0 / denom
 
-            end_x = self.ellipse_cx + dx * t
-            end_y = self.ellipse_cy + dy * t
-
-            self.radial_lines.append((self.batsman_pos, (end_x, end_y)))
-        
-        # Create segments
-        self.segments: List[Segment] = []
-        for i in range(self.config.num_wedges):
-            start_ray = self.radial_lines[i]
-            end_ray = self.radial_lines[(i + 1) % self.config.num_wedges]
-
-            for z in range(self.config.num_zones):
-                t0 = z / self.config.num_zones
-                t1 = (z+1) / self.config.num_zones
-
-                # Four corners of that wedge-zone
-                p1_inner = GeometryUtils.lerp(*start_ray, t0)
-                p1_outer = GeometryUtils.lerp(*start_ray, t1)
-                p2_outer = GeometryUtils.lerp(*end_ray, t1)
-                p2_inner = GeometryUtils.lerp(*end_ray, t0)
-
-                poly = [p1_inner, p1_outer, p2_outer, p2_inner]
-                self.segments.append({
-                    'id': f"W{i}Z{z}",
-                    'poly': poly,
-                    'coverage': 0
-                })
-        
-        # Default fielder positions
-        self.fielders = [
-            (700, 300),  # Wicket-keeper
-            (630, 500),  # Mid-off
-            (650, 410),  # Short cover
-            (500, 300),  # Deep point
-            (685, 290),  # 1st slip
-            (670, 292),  # 2nd slip
-            (655, 298),  # 3rd slip
-            (790, 425),  # Midwicket
-            (850, 225),  # Fine leg
-            (750, 625),  # Long on
-        ]
-
-    def _calculate_segment_coverage(self):
-        """Calculate which segments are covered by fielders"""
-        # Reset coverage
-        for segment in self.segments:
-            segment['coverage'] = 0
-        
-        # Update segment coverage based on fielders
-        for fielder in self.fielders:
-            # Calculate distance from the batsman
-            distance_to_batsman = math.sqrt(
-                (fielder[0] - self.batsman_pos[0])**2 + 
-                (fielder[1] - self.batsman_pos[1])**2
-            )
-            
-            # Adjust coverage radius based on distance to batsman
-            adjusted_range = max(10, self.config.fielder_range + int(distance_to_batsman * 0.25))
-
-            for segment in self.segments:
-                if segment['id'] in ['W4Z0', 'W4Z1', 'W4Z2']:
-                    segment['coverage'] = 1
-                if GeometryUtils.circle_intersects_polygon(fielder, adjusted_range, segment['poly']):
-                    segment['coverage'] += 1
-
-    def _update_shot_probabilities(self):
-        """Update shot probabilities based on current game state"""
-        self.potential_shots = ShotAnalyzer.find_potential_shots(
-            self.segments,
-            self.current_delivery_line, 
-            self.current_delivery_length, 
-            batsman
-        )
-        self.adjusted_potential_shots = ShotAnalyzer.adjust_potential_shots(
-            self.potential_shots, 
-            self.aggression_level
-        )
-        self.shot_probabilities = ShotAnalyzer.calculate_potential_shot_probabilities(
-            self.adjusted_potential_shots
-        )
-        # Sort the shot probabilities in descending order
-        self.shot_probabilities = dict(sorted(
-            self.shot_probabilities.items(), 
-            key=lambda item: item[1], 
-            reverse=True
-        ))
-        
-        # Calculate zone probabilities
-        self.zones_probabilities: Dict[str, float] = {}
-        for segment_id, probability in self.shot_probabilities.items():
-            if segment_id.startswith('W'):
-                zone = segment_id.split('Z')[1]
-                if zone not in self.zones_probabilities:
-                    self.zones_probabilities[zone] = 0
-                self.zones_probabilities[zone] += probability
-
-    def _handle_events(self):
+        # Background analysis, started by run(); without it recomputation happens inline
+        self.analysis_worker: Optional['AnalysisWorker'] = None
+        self.analysis_done_event = pygame.event.custom_type()
+        self.completed_analysis: Optional['AnalysisResult'] = None
+        self.analysis_version = 0
+        self.applied_version = 0
+        self.report_analysis = True  # print the latest request's result once applied
+
+        # Field optimisation runs on its own thread and hands over its latest best candidate
+        self.optimiser_thread: Optional[threading.Thread] = None
+        self.optimiser_event = pygame.event.custom_type()
+        self.optimiser_candidate: Optional[Tuple[Optional[List[Point]], Optional[float], bool]] = None  # fielders, score, final
+        self.optimiser_lock = threading.Lock()
+        self.computing_rect = pygame.Rect(140, 16, 100, 16)
+
+        # Frame phase tracing, off unless configured so untraced methods stay unwrapped
+        self.tracer: Optional['FrameTracer'] = None
+        self.trace_overlay_enabled = False
+        self.trace_overlay_rect = pygame.Rect(10, 800, 240, 90)
+        if config.trace:
+            from frame_tracer import FrameTracer
+            self._install_tracer(FrameTracer(config.trace_capacity))
+
+    def _install_tracer(self, tracer: 'FrameTracer'):
+        """Shadow each traced method with a timing wrapper on this instance"""
+        self.tracer = tracer
+        names = TRACED_METHODS + tuple(name for name in dir(type(self)) if name.startswith('_draw'))
+        for name in names:
+            setattr(self, name, tracer.wrap(name, getattr(self, name)))
+
+    def _handle_events(self, events: Optional[List[pygame.event.Event]] = None):
         """Handle pygame events"""
-        for event in pygame.event.get():
+        for event in events if events is not None else pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
 
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                self._mark_dirty()
+
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 self._handle_mouse_down(event)
 
@@ -215,10 +164,17 @@ class CricketField:
             elif event.type == pygame.KEYDOWN:
                 self._handle_key_down(event)
 
+            elif event.type == self.analysis_done_event:
+                self._apply_analysis()
+
+            elif event.type == self.optimiser_event:
+                self._apply_optimiser_candidate()
+
     def _handle_mouse_down(self, event: pygame.event.Event):
         """Handle mouse down events"""
         mouse_pos = pygame.mouse.get_pos()
-        for i, fielder in enumerate(self.fielders):
+        # Fielders stay put while the optimiser is placing them
+        for i, fielder in enumerate(self.fielders if self.optimiser_thread is None else []):
             fx, fy = fielder
             if math.hypot(mouse_pos[0] - fx, mouse_pos[1] - fy) < 10:
                 self.selected_fielder = i
@@ -234,20 +190,22 @@ class CricketField:
     def _handle_mouse_up(self):
         """Handle mouse up events"""
         if self.selected_fielder is not None:
-            self.selected_fielder = None
-            # Recalculate segment coverage
-            self._calculate_segment_coverage()
-            self._update_shot_probabilities()
-            self.print_shot_analysis()
+            moved, self.selected_fielder = self.selected_fielder, None
+            self._recompute(moved)
 
     def _handle_mouse_motion(self, event: pygame.event.Event):
         """Handle mouse motion events"""
         if self.selected_fielder is not None:
             mouse_x, mouse_y = event.pos
+            self._mark_dirty(self._fielder_rect(self.fielders[self.selected_fielder]))
             self.fielders[self.selected_fielder] = (mouse_x + self.offset_x, mouse_y + self.offset_y)
+            self._mark_dirty(self._fielder_rect(self.fielders[self.selected_fielder]))
 
     def _handle_key_down(self, event: pygame.event.Event):
         """Handle key down events"""
+        if event.key in (pygame.K_RIGHT, pygame.K_LEFT, pygame.K_g, pygame.K_z, pygame.K_f, pygame.K_h):
+            self._mark_dirty()
+
         if event.key == pygame.K_RIGHT:
             self.selected_wedge = (self.selected_wedge + 1) % self.config.num_wedges
         elif event.key == pygame.K_LEFT:
@@ -258,29 +216,179 @@ class CricketField:
             self.zones_enabled = not self.zones_enabled
         elif event.key == pygame.K_f:
             self.fielder_coverage_enabled = not self.fielder_coverage_enabled
+        elif event.key == pygame.K_b and self.roster is not None and not any(self.input_active.values()):
+            self.roster_index = (self.roster_index + 1) % len(self.roster)
+            self.batsman = self.roster.batsman(self.roster_index)
+            # The heatmap was built for the previous batsman
+            self.delivery_heatmap = None
+            self.panels_dirty = True
+            print(f"Batsman: {self.roster.names[self.roster_index]}")
+            self._recompute()
+        elif event.key == pygame.K_h:
+            self.heatmap_enabled = not self.heatmap_enabled
+            self.panels_dirty = True
+        elif event.key == pygame.K_o and not any(self.input_active.values()):
+            self._optimise_field()
+        elif event.key == pygame.K_t and self.tracer is not None:
+            self.trace_overlay_enabled = not self.trace_overlay_enabled
+            self._mark_dirty()
         
         for key in self.input_active:
             if self.input_active[key]:
                 if event.key == pygame.K_RETURN:
                     self.input_active[key] = False
-                    self._update_shot_probabilities()
-                    self.print_shot_analysis()
+                    self._recompute()
                 elif event.key == pygame.K_BACKSPACE:
                     self.input_text[key] = self.input_text[key][:-1]
+                    self._mark_dirty(self.input_boxes[key])
                 elif event.unicode.isdigit():
                     self.input_text[key] += event.unicode
+                    self._mark_dirty(self.input_boxes[key])
+
+    def _recompute(self, moved_fielder: Optional[int] = None, new_field: bool = False, report: bool = True):
+        """Bring coverage and probabilities up to date, in the background when the worker runs
+
+        moved_fielder names the only fielder that moved; new_field means any of
+        them may have. report prints the analysis once it is up to date.
+        """
+        if self.analysis_worker is None:
+            if new_field:
+                self._calculate_segment_coverage()
+            elif moved_fielder is not None:
+                # Recalculate coverage for the moved fielder only
+                self._move_fielder(moved_fielder, self.fielders[moved_fielder])
+            self._update_shot_probabilities()
+            self._mark_dirty()
+            if report:
+                self.print_shot_analysis()
+            return
+
+        self._update_input_values()
+        self.report_analysis = report
+        self.analysis_version = self.analysis_worker.submit(
+            self.fielders,
+            self.current_delivery_line,
+            self.current_delivery_length,
+            self.aggression_level,
+            self.batsman
+        )
+        self._mark_dirty(self.computing_rect)
+
+    def _on_analysis_done(self, result: 'AnalysisResult'):
+        """Worker thread: hand the result over and wake the event loop; _apply_analysis decides if it is current"""
+        self.completed_analysis = result
+        pygame.event.post(pygame.event.Event(self.analysis_done_event))
+
+    def _apply_analysis(self):
+        """Swap a finished result in between frames, so panels never show half of one"""
+        result = self.completed_analysis
+        if result is None or result.version != self.analysis_version or result.version <= self.applied_version:
+            return
+        self.fielder_coverage = result.fielder_coverage
+        self.fielder_interception = result.fielder_interception
+        self._apply_fielder_coverage()
+        if self.coverage_raster is not None:
+            self.coverage_raster.build(result.fielders, [self._adjusted_range(fielder) for fielder in result.fielders])
+
+        # Keyed by the request the result answers, not whatever the UI shows by now
+        self.probability_cache.put(
+            ShotProbabilityCache.make_key(self.shot_coverage, result.line, result.length, result.aggression, result.batsman),
+            result.probabilities
+        )
+        self._set_shot_probabilities(result.probabilities)
+        self.panels_dirty = True
+        self.applied_version = result.version
+        self._mark_dirty()
+        if self.report_analysis:
+            cache = self.analysis_worker.model.probability_cache if self.analysis_worker is not None else None
+            self.print_shot_analysis(result.probabilities, cache)
+
+    def _optimise_field(self):
+        """Search for a better field in the background, showing each new best candidate live"""
+        from field_optimiser import FieldOptimiser
+
+        if self.optimiser_thread is not None:
+            return
+        optimiser = FieldOptimiser(
+            self.config,
+            self.batsman,
+            self.current_delivery_line,
+            self.current_delivery_length,
+            self.aggression_level,
+            self.fielders
+        )
+
+        def hand_over(fielders: Optional[List[Point]], score: Optional[float], final: bool = False):
+            # Only the newest candidate matters, so one waiting in the handover is replaced
+            with self.optimiser_lock:
+                self.optimiser_candidate = (list(fielders) if fielders is not None else None, score, final)
+            pygame.event.post(pygame.event.Event(self.optimiser_event))
 
-    def _draw(self):
-        """Draw all elements to the screen"""
+        def search():
+            fielders, score = None, None
+            try:
+                result = optimiser.optimise(chains=2, callback=hand_over)
+                fielders, score = result.fielders, result.score
+            finally:
+                # A final handover, even after an error, re-enables O and dragging
+                hand_over(fielders, score, final=True)
+
+        self.optimiser_thread = threading.Thread(target=search, name="field-optimiser", daemon=True)
+        self.optimiser_thread.start()
+
+    def _apply_optimiser_candidate(self):
+        """Show the optimiser's latest candidate, through _recompute so older results are dropped"""
+        with self.optimiser_lock:
+            candidate, self.optimiser_candidate = self.optimiser_candidate, None
+        if candidate is None:
+            return
+        fielders, score, final = candidate
+        if fielders is None:
+            self.optimiser_thread = None
+            print("Optimisation failed, keeping the current field")
+            return
+        self._mark_dirty()
+        self.fielders = fielders
+        if final:
+            self.optimiser_thread = None
+            print(f"Optimised field: uncovered probability {score:.3f}")
+        self._recompute(new_field=True, report=final)
+
+    def _fielder_rect(self, position: Point) -> pygame.Rect:
+        """Screen area a fielder and, when shown, its coverage disc occupy"""
+        radius = self._adjusted_range(position) if self.fielder_coverage_enabled else 4
+        radius += 2
+        return pygame.Rect(int(position[0] - radius), int(position[1] - radius), int(2 * radius) + 1, int(2 * radius) + 1)
+
+    def _mark_dirty(self, rect: Optional[pygame.Rect] = None):
+        """Schedule a redraw of one region, or of the whole screen when no rect is given"""
+        if rect is None:
+            self.full_redraw = True
+        else:
+            self.dirty_rects.append(rect)
+
+    def _present(self):
+        """Redraw whatever has been marked dirty since the last frame"""
+        if self.trace_overlay_enabled and self.dirty_rects:
+            self.dirty_rects.append(self.trace_overlay_rect)
+        if self.full_redraw:
+            self._draw()
+        elif self.dirty_rects:
+            area = self.dirty_rects[0].unionall(self.dirty_rects[1:])
+            surfaces = (self.screen, self.coverage_surface)
+            for surface in surfaces:
+                surface.set_clip(area)
+            self._draw(self.dirty_rects)
+            for surface in surfaces:
+                surface.set_clip(None)
+        self.full_redraw = False
+        self.dirty_rects = []
+
+    def _draw(self, dirty_rects: Optional[List[pygame.Rect]] = None):
+        """Draw all elements to the screen, updating only dirty_rects when given"""
         self._update_input_values()
         self._clear_surfaces()
-        self._draw_background()
-        
-        if self.grid_enabled:
-            self._draw_grid()
-        
-        if self.zones_enabled:
-            self._draw_zones()
+        self.screen.blit(self._static_layer(), (0, 0))
         
         if self.fielder_coverage_enabled:
             self._draw_fielder_coverage()
@@ -290,13 +398,22 @@ class CricketField:
         self._draw_players()
         self._draw_zone_probabilities()
         self._draw_segment_probabilities()
+        if self.heatmap_enabled:
+            self._draw_heatmap()
         self._draw_ui()
+        if self.analysis_version != self.applied_version:
+            self.screen.blit(self._render_text(10, "Computing...", (255, 200, 0)), self.computing_rect.topleft)
+        if self.trace_overlay_enabled:
+            self._draw_trace_overlay()
         
         # Final compositing
         self.screen.blit(self.coverage_surface, (0, 0))
         self.screen.blit(self.highlight_surface, (0, 0))
         
-        pygame.display.flip()
+        if dirty_rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty_rects)
 
     def _update_input_values(self):
         """Update game values from input boxes"""
@@ -310,14 +427,25 @@ class CricketField:
     def _clear_surfaces(self):
         """Clear the transparent surfaces"""
         self.coverage_surface.fill((0, 0, 0, 0))
-        self.highlight_surface.fill((0, 0, 0, 0))
-        self.screen.fill(self.colors['DARK_BG'])
 
-    def _draw_background(self):
+    def _static_layer(self) -> pygame.Surface:
+        """Background, grid and zones, re-rendered only when config or toggles change"""
+        key = (astuple(self.config), self.grid_enabled, self.zones_enabled, self.inner_circle_enabled)
+        if self.static_layer_key != key:
+            self.static_layer.fill(self.colors['DARK_BG'])
+            self._draw_background(self.static_layer)
+            if self.grid_enabled:
+                self._draw_grid(self.static_layer)
+            if self.zones_enabled:
+                self._draw_zones(self.static_layer)
+            self.static_layer_key = key
+        return self.static_layer
+
+    def _draw_background(self, surface: pygame.Surface):
         """Draw the basic field background"""
         # Draw oval ground
         pygame.draw.ellipse(
-            self.screen, 
+            surface, 
             self.colors['DARK_GREEN'], 
             (
                 self.config.field_x, 
@@ -328,73 +456,56 @@ class CricketField:
         )
         
         # Draw boundary line
-        pygame.draw.ellipse(self.screen, self.colors['LIGHT_GRAY'], (460, 160, 480, 480), 2)
+        pygame.draw.ellipse(surface, self.colors['LIGHT_GRAY'], (460, 160, 480, 480), 2)
 
         # Draw inner circle
         if self.inner_circle_enabled:
-            pygame.draw.circle(self.screen, self.colors['LIGHT_GRAY'], (700, 400), 130, 2)
+            pygame.draw.circle(surface, self.colors['LIGHT_GRAY'], (700, 400), 130, 2)
 
-    def _draw_grid(self):
+    def _draw_grid(self, surface: pygame.Surface):
         """Draw coordinate grid"""
         # Draw grid lines and numbers
         for x in range(0, self.config.width, 25):
-            pygame.draw.line(self.screen, self.colors['GRID_COLOR'], (x, 0), (x, self.config.height))
+            pygame.draw.line(surface, self.colors['GRID_COLOR'], (x, 0), (x, self.config.height))
             text = self.font.render(str(x), True, self.colors['LIGHT_GRAY'])
-            self.screen.blit(text, (x, 5))
+            surface.blit(text, (x, 5))
             
         for y in range(0, self.config.height, 25):
-            pygame.draw.line(self.screen, self.colors['GRID_COLOR'], (0, y), (y, self.config.height))
+            pygame.draw.line(surface, self.colors['GRID_COLOR'], (0, y), (y, self.config.height))
             text = self.font.render(str(y), True, self.colors['LIGHT_GRAY'])
-            self.screen.blit(text, (5, y))
+            surface.blit(text, (5, y))
 
-    def _draw_zones(self):
+    def _draw_zones(self, surface: pygame.Surface):
         """Draw zone divisions on the field"""
         # Draw radial lines
         for ray in self.radial_lines:
-            pygame.draw.line(self.screen, self.colors['ZONE_COLOR'], ray[0], ray[1], 1)
-
-        # Draw zones by connecting pairs of wedge lines
-        for i in range(len(self.radial_lines)):
-            start_ray = self.radial_lines[i]
-            next_ray = self.radial_lines[(i+1) % len(self.radial_lines)]
-            for z in range(self.config.num_zones):
-                t0 = z / self.config.num_zones
-                t1 = (z+1) / self.config.num_zones
-
-                # lerp from batsman_pos → boundary_point
-                p1_i = GeometryUtils.lerp(start_ray[0], start_ray[1], t0)
-                p1_o = GeometryUtils.lerp(start_ray[0], start_ray[1], t1)
-                p2_o = GeometryUtils.lerp(next_ray[0], next_ray[1], t1)
-                p2_i = GeometryUtils.lerp(next_ray[0], next_ray[1], t0)
-
-                pygame.draw.polygon(
-                    self.screen, self.colors['ZONE_COLOR'],
-                    [p1_i, p1_o, p2_o, p2_i], 1
-                )
+            pygame.draw.line(surface, self.colors['ZONE_COLOR'], ray[0], ray[1], 1)
+
+        # Segment polygons already connect each pair of wedge lines
+        for segment in self.segments:
+            pygame.draw.polygon(surface, self.colors['ZONE_COLOR'], segment['poly'], 1)
 
     def _draw_fielder_coverage(self):
         """Draw fielder coverage areas"""
         for pos in self.fielders:
-            distance_to_batsman = math.sqrt((pos[0] - self.batsman_pos[0])**2 + (pos[1] - self.batsman_pos[1])**2)
-            
-            # Adjust coverage radius based on distance to batsman
-            adjusted_range = max(10, self.config.fielder_range + int(distance_to_batsman * 0.25))
-            
-            pygame.draw.circle(self.coverage_surface, self.colors['COVERAGE_COLOR'], pos, adjusted_range)
+            pygame.draw.circle(self.coverage_surface, self.colors['COVERAGE_COLOR'], pos, self._adjusted_range(pos))
 
     def _draw_highlights(self):
         """Draw highlighted segments"""
-        # Draw coverage highlights
-        for seg in self.segments:
-            if seg['coverage'] > 0:
-                alpha = min(255, int(255 * (seg['coverage'] / len(self.fielders))))
+        # Draw coverage highlights, only redrawn when coverage changes
+        if self.highlight_version != self.coverage_version:
+            self.highlight_surface.fill((0, 0, 0, 0))
+            field_coverage = self.coverage[self.segment_indices]
+            for k in np.flatnonzero(field_coverage):
+                alpha = min(255, int(255 * (field_coverage[k] / len(self.fielders))))
                 color = (255, 255, 0, alpha)
-                pygame.draw.polygon(self.highlight_surface, color, seg['poly'])
+                pygame.draw.polygon(self.highlight_surface, color, self.segments[k]['poly'])
+            self.highlight_version = self.coverage_version
         
         # Highlight the selected wedge
-        for segment in self.segments:
-            if segment['id'].startswith(f"W{self.selected_wedge}Z"):
-                pygame.draw.polygon(self.screen, (0, 200, 255), segment['poly'], 2)  # cyan outline
+        first = self.selected_wedge * self.config.num_zones
+        for segment in self.segments[first:first + self.config.num_zones]:
+            pygame.draw.polygon(self.screen, (0, 200, 255), segment['poly'], 2)  # cyan outline
 
     def _draw_pitch(self):
         """Draw the cricket pitch"""
@@ -423,144 +534,324 @@ class CricketField:
 
     def _draw_zone_probabilities(self):
         """Draw zone probabilities on the left side of the screen"""
-        # Background panel - make it slimmer
-        panel_rect = pygame.Rect(10, 50, 120, 280)  # Reduced width from 140 to 120, moved left from 20 to 10
-        panel_color = (40, 40, 40)  # Slightly lighter than background
-        pygame.draw.rect(self.screen, panel_color, panel_rect)
-        pygame.draw.rect(self.screen, self.colors['LIGHT_GRAY'], panel_rect, 1)  # Border
-        
-        # Title
-        title_font = pygame.font.SysFont('Arial', 13)  # Slightly smaller font
-        title = title_font.render("Zone Probabilities", True, self.colors['WHITE'])
-        self.screen.blit(title, (panel_rect.x + 5, panel_rect.y + 5))
-        
+        if self.panels_dirty:
+            self._rebuild_probability_panels()
+        self.screen.blit(self.zone_panel, self.zone_panel_rect)
+
+    def _draw_segment_probabilities(self):
+        """Draw top 10 segment probabilities on the right side of the screen"""
+        if self.panels_dirty:
+            self._rebuild_probability_panels()
+        self.screen.blit(self.segment_panel, self.segment_panel_rect)
+
+    def _draw_heatmap(self):
+        """Draw expected runs per line and length below the zone panel"""
+        if self.panels_dirty:
+            self._rebuild_probability_panels()
+        self.screen.blit(self.heatmap_panel, self.heatmap_panel_rect)
+
+    def _render_heatmap_panel(self) -> pygame.Surface:
+        """Render the line x length expected-runs grid for the current field and aggression"""
+        if self.delivery_heatmap is None:
+            from delivery_heatmap import DeliveryHeatmap
+            self.delivery_heatmap = DeliveryHeatmap(self.config, self.batsman, samples=300)
+        heatmap = self.delivery_heatmap.compute(self.fielders, (self.aggression_level,))[0]
+
+        panel = pygame.Surface(self.heatmap_panel_rect.size).convert()
+        panel.fill((40, 40, 40))
+        pygame.draw.rect(panel, self.colors['LIGHT_GRAY'], panel.get_rect(), 1)  # Border
+        panel.blit(self._render_text(13, "Expected Runs", self.colors['WHITE']), (5, 5))
+
+        # Rows are lines, columns are lengths; cheaper deliveries are greener
+        cell_size = 15
+        most_runs = max(float(heatmap.max()), 1e-9)
+        for l, line_runs in enumerate(heatmap):
+            for k, runs in enumerate(line_runs):
+                red_value = min(255, int(255 * runs / most_runs))
+                cell = pygame.Rect(7 + k * cell_size, 28 + l * cell_size, cell_size - 1, cell_size - 1)
+                pygame.draw.rect(panel, (red_value, 255 - red_value, 0), cell)
+                if (l + 1, k + 1) == (self.current_delivery_line, self.current_delivery_length):
+                    pygame.draw.rect(panel, self.colors['WHITE'], cell, 1)
+        return panel
+
+    def _update_shot_probabilities(self) -> ShotProbabilityResult:
+        """Update shot probabilities and mark the panels for a rebuild"""
+        result = super()._update_shot_probabilities()
+        self.panels_dirty = True
+        return result
+
+    def _rebuild_probability_panels(self):
+        """Render both probability panels from the latest probabilities"""
         # Sort zone probabilities in descending order
         sorted_zones = sorted(
             self.zones_probabilities.items(), 
             key=lambda item: item[1], 
             reverse=True
         )
-        
-        # Display each zone with its probability
-        y_offset = 35  # Reduced from 40
-        zone_font = pygame.font.SysFont('Arial', 12)  # Smaller font
-        
-        for zone, probability in sorted_zones:
-            # Create color based on probability (higher = more green)
-            green_value = min(255, int(255 * probability * 5))
-            zone_color = (255 - green_value, green_value, 0)
-            
-            # Zone label
-            zone_text = zone_font.render(f"Zone {zone}:", True, self.colors['WHITE'])
-            self.screen.blit(zone_text, (panel_rect.x + 5, panel_rect.y + y_offset))
-            
-            # Probability value
-            prob_text = zone_font.render(f"{probability:.3f}", True, zone_color)  # Show 3 decimals instead of 4
-            self.screen.blit(prob_text, (panel_rect.x + 65, panel_rect.y + y_offset))  # Adjusted position
-            
-            # Progress bar background - made narrower
-            bar_rect = pygame.Rect(panel_rect.x + 5, panel_rect.y + y_offset + 18, 110, 6)  # Slimmer bar
-            pygame.draw.rect(self.screen, (70, 70, 70), bar_rect)
-            
-            # Probability bar
-            bar_width = int(110 * probability)  # Adjusted to match new width
-            if bar_width > 0:
-                prob_bar_rect = pygame.Rect(panel_rect.x + 5, panel_rect.y + y_offset + 18, bar_width, 6)
-                pygame.draw.rect(self.screen, zone_color, prob_bar_rect)
-            
-            y_offset += 32  # Slightly reduce spacing between entries
+        self.zone_panel = self._render_probability_panel(
+            self.zone_panel_rect,
+            "Zone Probabilities",
+            13,
+            [(f"Zone {zone}:", probability) for zone, probability in sorted_zones]
+        )
 
-    def _draw_segment_probabilities(self):
-        """Draw top 10 segment probabilities on the right side of the screen"""
-        # Background panel
-        panel_rect = pygame.Rect(1270, 10, 120, 400)  # Right side of screen
-        panel_color = (40, 40, 40)  # Same as zone probabilities panel
-        pygame.draw.rect(self.screen, panel_color, panel_rect)
-        pygame.draw.rect(self.screen, self.colors['LIGHT_GRAY'], panel_rect, 1)  # Border
-        
-        # Title
-        title_font = pygame.font.SysFont('Arial', 14)
-        title = title_font.render("Top Segments", True, self.colors['WHITE'])
-        self.screen.blit(title, (panel_rect.x + 5, panel_rect.y + 5))
-        
         # Get top 10 segments (filter out special segments like OUT, LEAVE, etc.)
         top_segments = [
             (seg_id, prob) for seg_id, prob in self.shot_probabilities.items()
             if seg_id.startswith('W')  # Only include actual field segments
         ][:10]  # Take only top 10
+        self.segment_panel = self._render_probability_panel(
+            self.segment_panel_rect,
+            "Top Segments",
+            14,
+            [(f"{segment_id}:", probability) for segment_id, probability in top_segments]
+        )
+        self.panels_dirty = False
+
+        if self.heatmap_enabled:
+            self.heatmap_panel = self._render_heatmap_panel()
+
+    def _render_probability_panel(self, panel_rect: pygame.Rect, title: str, title_size: int, rows: List[Tuple[str, float]]) -> pygame.Surface:
+        """Render a titled panel of labelled probability bars"""
+        panel = pygame.Surface(panel_rect.size).convert()
+        panel_color = (40, 40, 40)  # Slightly lighter than background
+        panel.fill(panel_color)
+        pygame.draw.rect(panel, self.colors['LIGHT_GRAY'], panel.get_rect(), 1)  # Border
         
-        # Display each segment with its probability
-        y_offset = 35
-        segment_font = pygame.font.SysFont('Arial', 12)
+        # Title
+        panel.blit(self._render_text(title_size, title, self.colors['WHITE']), (5, 5))
         
-        for segment_id, probability in top_segments:
+        # Display each row with its probability
+        y_offset = 35
+        for label, probability in rows:
             # Create color based on probability (higher = more green)
             green_value = min(255, int(255 * probability * 5))
-            segment_color = (255 - green_value, green_value, 0)
+            row_color = (255 - green_value, green_value, 0)
             
-            # Segment label
-            segment_text = segment_font.render(f"{segment_id}:", True, self.colors['WHITE'])
-            self.screen.blit(segment_text, (panel_rect.x + 5, panel_rect.y + y_offset))
+            # Row label
+            panel.blit(self._render_text(12, label, self.colors['WHITE']), (5, y_offset))
             
             # Probability value
-            prob_text = segment_font.render(f"{probability:.3f}", True, segment_color)
-            self.screen.blit(prob_text, (panel_rect.x + 65, panel_rect.y + y_offset))
+            panel.blit(self._render_text(12, f"{probability:.3f}", row_color), (65, y_offset))
             
             # Progress bar background
-            bar_rect = pygame.Rect(panel_rect.x + 5, panel_rect.y + y_offset + 18, 110, 6)
-            pygame.draw.rect(self.screen, (70, 70, 70), bar_rect)
+            bar_rect = pygame.Rect(5, y_offset + 18, 110, 6)
+            pygame.draw.rect(panel, (70, 70, 70), bar_rect)
             
             # Probability bar
             bar_width = int(110 * probability)
             if bar_width > 0:
-                prob_bar_rect = pygame.Rect(panel_rect.x + 5, panel_rect.y + y_offset + 18, bar_width, 6)
-                pygame.draw.rect(self.screen, segment_color, prob_bar_rect)
+                prob_bar_rect = pygame.Rect(5, y_offset + 18, bar_width, 6)
+                pygame.draw.rect(panel, row_color, prob_bar_rect)
             
             y_offset += 32
+        return panel
+
+    def _render_text(self, size: int, text: str, color: RgbColor | RgbaColor) -> pygame.Surface:
+        """Render text with a registry font, reusing earlier renders"""
+        key = (size, text, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            if len(self.text_cache) >= self.text_cache_limit:
+                self.text_cache.clear()
+            surface = self.fonts[size].render(text, True, color)
+            self.text_cache[key] = surface
+        return surface
 
     def _draw_ui(self):
         """Draw UI elements"""
         # Display current wedge index
-        wedge_text = self.font.render(f"Wedge: W{self.selected_wedge}", True, (255, 255, 255))
+        wedge_text = self._render_text(10, f"Wedge: W{self.selected_wedge}", (255, 255, 255))
         self.screen.blit(wedge_text, (20, 20))  # Top-left corner
 
         # Draw input boxes
         for key in self.input_boxes:
             pygame.draw.rect(self.screen, self.input_colors[key], self.input_boxes[key], 2)
-            txt_surface = self.font.render(self.input_text[key], True, (255, 255, 255))
+            txt_surface = self._render_text(10, self.input_text[key], (255, 255, 255))
             self.screen.blit(txt_surface, (self.input_boxes[key].x + 5, self.input_boxes[key].y + 5))
 
         # Add labels for input boxes
-        line_label = self.font.render("Line:", True, (255, 255, 255))
+        line_label = self._render_text(10, "Line:", (255, 255, 255))
         self.screen.blit(line_label, (560, 24))
-        length_label = self.font.render("Length:", True, (255, 255, 255))
+        length_label = self._render_text(10, "Length:", (255, 255, 255))
         self.screen.blit(length_label, (550, 64))
 
+    def _draw_trace_overlay(self):
+        """Bar graph of recent frame times, with a line at 60 fps"""
+        assert self.tracer is not None
+        rect = self.trace_overlay_rect
+        frames = self.tracer.recent('_draw', rect.width // 2) * 1000
+        pygame.draw.rect(self.screen, (40, 40, 40), rect)
+        pygame.draw.rect(self.screen, self.colors['LIGHT_GRAY'], rect, 1)  # Border
+        if frames.size == 0:
+            return
+
+        graph_top = rect.y + 20
+        graph_height = rect.bottom - 2 - graph_top
+        scale = graph_height / max(1000 / 30, float(frames.max()))
+        for i, frame_ms in enumerate(frames):
+            bar_height = max(1, int(frame_ms * scale))
+            color = (0, 200, 0) if frame_ms <= 1000 / 60 else (220, 60, 60)
+            pygame.draw.rect(self.screen, color, (rect.x + 1 + i * 2, rect.bottom - 2 - bar_height, 1, bar_height))
+        budget_y = rect.bottom - 2 - int(1000 / 60 * scale)
+        pygame.draw.line(self.screen, self.colors['LIGHT_GRAY'], (rect.x + 1, budget_y), (rect.right - 2, budget_y))
+
+        summary = f"Frame p50 {np.median(frames):.1f} ms  max {frames.max():.1f} ms"
+        self.screen.blit(self._render_text(10, summary, self.colors['WHITE']), (rect.x + 5, rect.y + 4))
+
     def run(self):
         """Main game loop"""
         self.print_shot_analysis()
+        state = hot_reload.load_state()
+        if state is not None:
+            self.restore_state(state)
+        self._mark_dirty()
+        self.observer, self.event_handler = watch_for_changes()
+        if self.config.background_analysis:
+            self._start_analysis_worker()
         while self.running:
-            if self.event_handler.is_modified():
-                self.observer.stop()
-                self.observer.join()
-                pygame.quit()
-                restart_program()
-            self._handle_events()
-            self._draw()
+            changes = self.event_handler.take_changes(self.config.reload_debounce_ms / 1000)
+            if changes:
+                self._apply_source_changes(changes)
+            self._present()
+
+            # Sleep until input arrives, waking periodically for the watchdog check
+            event = pygame.event.wait(self.config.idle_timeout_ms)
+            if event.type != pygame.NOEVENT:
+                self._handle_events([event] + pygame.event.get())
         
         self.observer.stop()
         self.observer.join()
+        self._stop_analysis_worker()
+        stats = self.event_handler.stats()
+        print(f"Watcher: {stats.watched_paths} paths, {stats.matched}/{stats.events} events matched, {stats.events_per_second:.2f} events/s")
+        if self.tracer is not None:
+            self.tracer.dump(self.config.trace_path)
+            print(f"Trace written to {self.config.trace_path}")
         pygame.quit()
         sys.exit()
         pygame.quit()
 
-    def print_shot_analysis(self):
-        """Print analysis of shot probabilities"""
+    def state(self) -> Dict[str, Any]:
+        """Everything the user has set up, in a JSON-friendly form"""
+        return {
+            'fielders': [list(fielder) for fielder in self.fielders],
+            'line': self.current_delivery_line,
+            'length': self.current_delivery_length,
+            'aggression': self.aggression_level.name,
+            'roster_index': self.roster_index,
+            'selected_wedge': self.selected_wedge,
+            'input_text': dict(self.input_text),
+            'toggles': {
+                'grid': self.grid_enabled,
+                'zones': self.zones_enabled,
+                'inner_circle': self.inner_circle_enabled,
+                'fielder_coverage': self.fielder_coverage_enabled,
+                'heatmap': self.heatmap_enabled
+            }
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        """Apply a state() snapshot and recompute everything derived from it"""
+        self.fielders = [tuple(fielder) for fielder in state['fielders']]
+        self.current_delivery_line = state['line']
+        self.current_delivery_length = state['length']
+        self.aggression_level = Aggression[state['aggression']]
+        self.selected_wedge = state['selected_wedge']
+        self.input_text = dict(state['input_text'])
+        toggles = state['toggles']
+        self.grid_enabled = toggles['grid']
+        self.zones_enabled = toggles['zones']
+        self.inner_circle_enabled = toggles['inner_circle']
+        self.fielder_coverage_enabled = toggles['fielder_coverage']
+        self.heatmap_enabled = toggles['heatmap']
+        if self.roster is not None and 0 <= state['roster_index'] < len(self.roster):
+            self.roster_index = state['roster_index']
+            self.batsman = self.roster.batsman(self.roster_index)
+            self.delivery_heatmap = None
+            self.panels_dirty = True
+
+        self._calculate_segment_coverage()
+        self._update_shot_probabilities()
+        self._mark_dirty()
+
+    def _apply_source_changes(self, paths: List[str]):
+        """Reload changed analysis modules in place, or restart carrying the state over"""
+        modules = hot_reload.loaded_modules(paths)
+        if not modules:
+            return
+        if self.config.hot_reload and hot_reload.can_reload(modules):
+            try:
+                reloaded = hot_reload.reload_modules(modules)
+            except Exception as error:
+                # Keep running on the old code until the file is saved again
+                print(f"Reload failed: {error!r}")
+                return
+            print(f"Reloaded {', '.join(reloaded)}")
+            self._refresh_after_reload(reloaded)
+            return
+
+        hot_reload.save_state(self.state(), os.path.join(tempfile.gettempdir(), f"cricmg2d-state-{os.getpid()}.json"))
+        self.observer.stop()
+        self.observer.join()
+        self._stop_analysis_worker()
+        pygame.quit()
+        restart_program()
+
+    def _refresh_after_reload(self, reloaded: List[str]):
+        """Recompute only what the reloaded modules feed into"""
+        # The worker's model was built by the old code; stop it before recomputing
+        # inline, and the restart drops any result it finished for the old code
+        restart_worker = self.analysis_worker is not None
+        self._stop_analysis_worker()
+
+        if 'testing_data' in reloaded and self.roster_index < 0:
+            self.batsman = sys.modules['testing_data'].batsman
+
+        if 'geometry' in reloaded:
+            # Segment polygons come from geometry, so rebuild them around the current fielders
+            fielders = self.fielders
+            self._init_field_elements()
+            self.fielders = fielders
+            self.coverage_raster = None
+            self.static_layer_key = None
+            self._calculate_segment_coverage()
+
+        # Cached probabilities were produced by the old code
+        self.probability_cache.clear()
+        self.delivery_heatmap = None
+        self._update_shot_probabilities()
+        self._mark_dirty()
+        if restart_worker:
+            self._start_analysis_worker()
+
+    def _start_analysis_worker(self):
+        """Start a worker whose versions carry on from any earlier one, dropping its pending work"""
+        from analysis_worker import AnalysisWorker
+        self.applied_version = self.analysis_version
+        self.analysis_worker = AnalysisWorker(self.config, self._on_analysis_done, self.analysis_version)
+
+    def _stop_analysis_worker(self):
+        if self.analysis_worker is not None:
+            self.analysis_worker.stop()
+            print(f"Analysis worker: {self.analysis_worker.latest_version} requests, {self.analysis_worker.cancelled} cancelled as stale")
+            self.analysis_worker = None
+
+    def print_shot_analysis(self, result: Optional[ShotProbabilityResult] = None, cache: Optional[ShotProbabilityCache] = None):
+        """Print analysis of shot probabilities, by default for the displayed result"""
+        if result is None:
+            result = ShotProbabilityResult(
+                self.shot_values, self.shot_names, self.adjusted_shot_values,
+                self.segment_probabilities, self.shot_probabilities, self.zones_probabilities
+            )
+        cache = cache if cache is not None else self.probability_cache
+        potential_shots = ShotAnalyzer.shot_values_to_dict(self.grid, result.shot_values, result.shot_names)
         sorted_potential_shots = sorted(
-            self.potential_shots.items(),
+            potential_shots.items(),
             key=lambda item: item[1][0],  # Sort by shot value (first element in the tuple)
             reverse=True  # Descending order
         )
         print("Potential shots based on current delivery line and length:")
         for segment_id, (shot_value, shot_name) in sorted_potential_shots:
-            print(f"Segment: {segment_id}, Shot Value: {shot_value}, Shot Name: {shot_name}")
\ No newline at end of file
+            print(f"Segment: {segment_id}, Shot Value: {shot_value}, Shot Name: {shot_name}")
+        print(f"Probability cache: {cache.stats()}")
\ No newline at end of file
@@ -0,0 +1,92 @@
+import csv
+import hashlib
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from field_model import FieldModel
+from game_config import GameConfig
+from innings_simulator import InningsSimulator
+from _types import Aggression, Batsman, Length, Line, Point
+
+Cell = Tuple[int, int, Aggression]
+
+class DeliveryHeatmap:
+    """Expected runs per ball for every line x length x aggression cell
+
+    Each cell runs the shot probability pipeline for that delivery and then
+    samples balls through InningsSimulator. Results are cached per field
+    configuration, so asking again for the same field is free.
+    """
+
+    def __init__(self, config: GameConfig = GameConfig(), batsman: Optional[Batsman] = None, samples: int = 2000):
+        self.config = config
+        self.model = FieldModel(config, batsman)
+        self.samples = samples
+        self.lines = list(Line)
+        self.lengths = list(Length)
+        self._cache: Dict[bytes, np.ndarray] = {}
+
+    def _cache_key(self, aggressions: Sequence[Aggression]) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(self.model.shot_coverage).tobytes())
+        digest.update(repr((self.model.batsman, [a.value for a in aggressions], self.samples)).encode())
+        return digest.digest()
+
+    def compute(self, fielders: Optional[Sequence[Point]] = None, aggressions: Sequence[Aggression] = tuple(Aggression), processes: Optional[int] = None, seed: int = 0) -> np.ndarray:
+        """Expected runs per ball, shaped (aggressions, lines, lengths)"""
+        if fielders is not None:
+            self.model.fielders = list(fielders)
+            self.model._calculate_segment_coverage()
+
+        key = self._cache_key(aggressions)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        cells: List[Cell] = [
+            (line, length, aggression)
+            for aggression in aggressions
+            for line in self.lines
+            for length in self.lengths
+        ]
+        seeds = [seed + i for i in range(len(cells))]
+        if processes is None or processes <= 1:
+            values = [_expected_runs(self.model, cell, self.samples, cell_seed) for cell, cell_seed in zip(cells, seeds)]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(self.config, self.model.batsman, self.model.fielders)) as executor:
+                values = list(executor.map(_expected_runs_in_worker, cells, [self.samples] * len(cells), seeds, chunksize=4))
+
+        heatmap = np.array(values).reshape(len(aggressions), len(self.lines), len(self.lengths))
+        self._cache[key] = heatmap
+        return heatmap
+
+    def export_csv(self, heatmap: np.ndarray, path: str, aggressions: Sequence[Aggression] = tuple(Aggression)):
+        """Write one row per aggression and line, one column per length"""
+        with open(path, 'w', newline='') as handle:
+            writer = csv.writer(handle)
+            writer.writerow(['aggression', 'line'] + [length.name for length in self.lengths])
+            for a, aggression in enumerate(aggressions):
+                for l, line in enumerate(self.lines):
+                    writer.writerow([aggression.name, line.name] + [f"{value:.4f}" for value in heatmap[a, l]])
+
+def _expected_runs(model: FieldModel, cell: Cell, samples: int, seed: int) -> float:
+    line, length, aggression = cell
+    batsman: Batsman = {
+        **model.batsman,
+        'in_game_traits': {**model.batsman['in_game_traits'], 'aggression': aggression}
+    }
+    simulator = InningsSimulator(model, deliveries=[(line, length)], batsman=batsman)
+    summary = simulator.simulate(innings=samples, overs=1, seed=seed)
+    return summary.runs.mean / max(1, summary.balls / samples)
+
+_worker_model: Optional[FieldModel] = None
+
+def _init_worker(config: GameConfig, batsman: Batsman, fielders: List[Point]):
+    global _worker_model
+    _worker_model = FieldModel(config, batsman)
+    _worker_model.fielders = list(fielders)
+    _worker_model._calculate_segment_coverage()
+
+def _expected_runs_in_worker(cell: Cell, samples: int, seed: int) -> float:
+    assert _worker_model is not None
+    return _expected_runs(_worker_model, cell, samples, seed)
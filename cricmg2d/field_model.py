@@ -0,0 +1,261 @@
+import math
+import numpy as np
+import startup_timer
+from typing import List, Optional, Tuple
+from coverage_raster import CoverageRaster
+from game_config import GameConfig
+from geometry import GeometryUtils
+from interception import InterceptionModel
+from segments import SegmentGrid
+from shot_cache import ShotProbabilityCache, ShotProbabilityResult
+from shot_analyzer import ShotAnalyzer
+from testing_data import batsman as default_batsman
+from _types import Aggression, Batsman, Point, Segment
+
+class FieldModel:
+    """Field geometry, coverage and shot probabilities without any display"""
+
+    def __init__(self, config: GameConfig = GameConfig(), batsman: Optional[Batsman] = None):
+        # Store configuration
+        self.config = config
+        self.batsman: Batsman = batsman if batsman is not None else default_batsman
+
+        # Game state
+        self.current_delivery_line = 4
+        self.current_delivery_length = 5
+        self.aggression_level = Aggression.NEUTRAL
+
+        # Field elements
+        self.batsman_pos = (700, 360)
+        self.ellipse_cx = 700
+        self.ellipse_cy = 400
+        self.ellipse_rx = 240
+        self.ellipse_ry = 240
+
+        # Bumped whenever coverage changes so views can cache derived layers
+        self.coverage_version = 0
+        self.coverage_raster: Optional[CoverageRaster] = None
+
+        # Finished probabilities for previously seen field states
+        self.probability_cache = ShotProbabilityCache(config.probability_cache_size)
+
+        # Initialize field segments
+        self._init_field_elements()
+        startup_timer.mark("field geometry")
+        self._calculate_segment_coverage()
+        
+        # Calculate initial shot probabilities
+        self._update_shot_probabilities()
+        startup_timer.mark("first analysis")
+
+    def _init_field_elements(self):
+        """Initialize field elements, segments, and fielders"""
+        # Calculate wedge angles
+        self.wedge_angles = [i * 360/self.config.num_wedges for i in range(self.config.num_wedges)]
+        
+        # Calculate radial lines
+        self.radial_lines: List[Tuple[Point, Point]] = []
+        for angle in self.wedge_angles:
+            rad = math.radians(angle)
+            dx, dy = math.cos(rad), math.sin(rad)
+
+            # Solve for ellipse intersection
+            denom = math.sqrt((dx*dx)/(self.ellipse_rx*self.ellipse_rx) +
+                            (dy*dy)/(self.ellipse_ry*self.ellipse_ry))
+            t = 1.0 / denom
+
+            end_x = self.ellipse_cx + dx * t
+            end_y = self.ellipse_cy + dy * t
+
+            self.radial_lines.append((self.batsman_pos, (end_x, end_y)))
+        
+        # Create segments, indexed in wedge-major order to match the grid
+        self.grid = SegmentGrid(
+            self.config.num_wedges,
+            self.config.num_zones,
+            SegmentGrid.spaced_edges(self.config.num_zones, self.config.zone_spacing)
+        )
+        self.segment_indices = self.grid.field_indices()
+        self.coverage = np.zeros(self.grid.size, dtype=np.int32)
+        self.segments: List[Segment] = []
+        for i in range(self.config.num_wedges):
+            start_ray = self.radial_lines[i]
+            end_ray = self.radial_lines[(i + 1) % self.config.num_wedges]
+
+            for z in range(self.config.num_zones):
+                t0 = float(self.grid.zone_edges[z])
+                t1 = float(self.grid.zone_edges[z + 1])
+
+                # Four corners of that wedge-zone
+                p1_inner = GeometryUtils.lerp(*start_ray, t0)
+                p1_outer = GeometryUtils.lerp(*start_ray, t1)
+                p2_outer = GeometryUtils.lerp(*end_ray, t1)
+                p2_inner = GeometryUtils.lerp(*end_ray, t0)
+
+                poly = [p1_inner, p1_outer, p2_outer, p2_inner]
+                self.segments.append({
+                    'id': self.grid.segment_id(self.grid.index(i, z)),
+                    'poly': poly,
+                    'coverage': 0
+                })
+        self.segment_polys = np.array([segment['poly'] for segment in self.segments])
+
+        # What the shot pipeline treats as coverage: the fielder count, or intercept chances
+        self.interception_model: Optional[InterceptionModel] = None
+        self.fielder_interception: Optional[np.ndarray] = None
+        self.shot_coverage: np.ndarray = self.coverage
+        if self.config.coverage_model == 'interception':
+            self.interception_model = InterceptionModel(self.grid, self.segment_polys, self.batsman_pos, self.config.fielder_range)
+            self.shot_coverage = np.zeros(self.grid.size)
+        elif self.config.coverage_model != 'disc':
+            raise ValueError(f"Unknown coverage model: {self.config.coverage_model}")
+
+        # The pitch straight down the ground (base wedge 4, zones 0-2) always counts as covered
+        self.pitch_indices = np.concatenate([self.grid.base_cell_indices(4, z) for z in range(3)])
+        
+        # Default fielder positions
+        self.fielders = [
+            (700, 300),  # Wicket-keeper
+            (630, 500),  # Mid-off
+            (650, 410),  # Short cover
+            (500, 300),  # Deep point
+            (685, 290),  # 1st slip
+            (670, 292),  # 2nd slip
+            (655, 298),  # 3rd slip
+            (790, 425),  # Midwicket
+            (850, 225),  # Fine leg
+            (750, 625),  # Long on
+        ]
+
+    def _adjusted_range(self, fielder: Point) -> float:
+        """Coverage radius of a fielder, growing with distance from the batsman"""
+        distance_to_batsman = math.sqrt(
+            (fielder[0] - self.batsman_pos[0])**2 + 
+            (fielder[1] - self.batsman_pos[1])**2
+        )
+        return max(10, self.config.fielder_range + int(distance_to_batsman * 0.25))
+
+    def _fielder_coverage(self, fielder: Point) -> np.ndarray:
+        """Which field segments a single fielder's range reaches"""
+        adjusted_range = self._adjusted_range(fielder)
+        return GeometryUtils.circle_intersects_polygons(fielder, adjusted_range, self.segment_polys).astype(np.int32)
+
+    def _calculate_segment_coverage(self):
+        """Calculate which segments are covered by fielders"""
+        # One row per fielder so a single move only recomputes its own row
+        self.fielder_coverage = np.zeros((len(self.fielders), len(self.segments)), dtype=np.int32)
+        for i, fielder in enumerate(self.fielders):
+            self.fielder_coverage[i] = self._fielder_coverage(fielder)
+        if self.interception_model is not None:
+            self.fielder_interception = self.interception_model.fielder_rows(self.fielders)
+        self._apply_fielder_coverage()
+        if self.coverage_raster is not None:
+            self.coverage_raster.build(self.fielders, [self._adjusted_range(fielder) for fielder in self.fielders])
+
+    def _move_fielder(self, index: int, position: Point):
+        """Move one fielder and update coverage incrementally"""
+        self.fielders[index] = position
+        self.fielder_coverage[index] = self._fielder_coverage(position)
+        if self.interception_model is not None and self.fielder_interception is not None:
+            self.fielder_interception[index] = self.interception_model.fielder_row(position)
+        self._apply_fielder_coverage()
+        if self.coverage_raster is not None:
+            self.coverage_raster.move(index, position, self._adjusted_range(position))
+
+    def _coverage_raster(self) -> CoverageRaster:
+        """Rasterised coverage, built on first use and kept in step with fielder moves after"""
+        if self.coverage_raster is None:
+            self.coverage_raster = CoverageRaster(self.config)
+            self.coverage_raster.build(self.fielders, [self._adjusted_range(fielder) for fielder in self.fielders])
+            self.segment_spans = [self.coverage_raster.polygon_spans(segment['poly']) for segment in self.segments]
+        return self.coverage_raster
+
+    def _raster_segment_coverage(self) -> np.ndarray:
+        """Covered cell count per field segment, read from the raster's summed-area table"""
+        raster = self._coverage_raster()
+        return np.array([raster.spans_sum(spans) for spans in self.segment_spans])
+
+    def _apply_fielder_coverage(self):
+        """Sum the per-fielder rows into the segment coverage vector"""
+        self.coverage[:] = 0
+        self.coverage[self.segment_indices] = self.fielder_coverage.sum(axis=0)
+
+        self.coverage[self.pitch_indices] = np.maximum(self.coverage[self.pitch_indices], 1)
+        for segment, count in zip(self.segments, self.coverage[self.segment_indices]):
+            segment['coverage'] = int(count)
+
+        if self.interception_model is not None and self.fielder_interception is not None:
+            self.shot_coverage[:] = InterceptionModel.combine(self.fielder_interception)
+            self.shot_coverage[self.pitch_indices] = 1.0
+        self.coverage_version += 1
+
+    def _inside_field(self, position: Point) -> bool:
+        dx = (position[0] - self.ellipse_cx) / self.ellipse_rx
+        dy = (position[1] - self.ellipse_cy) / self.ellipse_ry
+        return dx * dx + dy * dy <= 1
+
+    def _update_shot_probabilities(self) -> ShotProbabilityResult:
+        """Update shot probabilities based on current game state"""
+        cache_key = ShotProbabilityCache.make_key(
+            self.shot_coverage,
+            self.current_delivery_line,
+            self.current_delivery_length,
+            self.aggression_level,
+            self.batsman
+        )
+        result = self.probability_cache.get(cache_key)
+        if result is None:
+            result = self._compute_shot_probabilities()
+            self.probability_cache.put(cache_key, result)
+        self._set_shot_probabilities(result)
+        return result
+
+    def _set_shot_probabilities(self, result: ShotProbabilityResult):
+        """Expose a finished result through the model's attributes"""
+        (
+            self.shot_values,
+            self.shot_names,
+            self.adjusted_shot_values,
+            self.segment_probabilities,
+            self.shot_probabilities,
+            self.zones_probabilities
+        ) = result
+
+    def _compute_shot_probabilities(self) -> ShotProbabilityResult:
+        """Run the full find, adjust, normalise and aggregate pipeline"""
+        shot_values, shot_names = ShotAnalyzer.find_potential_shot_values(
+            self.grid,
+            self.shot_coverage,
+            self.current_delivery_line, 
+            self.current_delivery_length, 
+            self.batsman
+        )
+        adjusted_shot_values = ShotAnalyzer.adjust_shot_values(
+            self.grid,
+            shot_values,
+            shot_names,
+            self.aggression_level
+        )
+        segment_probabilities = ShotAnalyzer.calculate_shot_value_probabilities(
+            adjusted_shot_values
+        )
+
+        # String-keyed views for the display panels, sorted in descending order
+        shot_probabilities = ShotAnalyzer.probabilities_to_dict(
+            self.grid,
+            segment_probabilities,
+            shot_names
+        )
+        zones_probabilities = ShotAnalyzer.zone_probabilities(
+            self.grid,
+            segment_probabilities,
+            shot_names
+        )
+        return ShotProbabilityResult(
+            shot_values,
+            shot_names,
+            adjusted_shot_values,
+            segment_probabilities,
+            shot_probabilities,
+            zones_probabilities
+        )
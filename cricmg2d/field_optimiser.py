@@ -0,0 +1,142 @@
+import math
+import random
+import numpy as np
+from typing import Callable, List, NamedTuple, Optional, Sequence
+from field_model import FieldModel
+from game_config import GameConfig
+from _types import Aggression, Batsman, Point
+
+ImprovementCallback = Callable[[List[Point], float], None]
+
+class OptimisationResult(NamedTuple):
+    fielders: List[Point]
+    score: float
+    iterations: int
+
+class FieldOptimiser:
+    """Simulated annealing search for fielder positions
+
+    The score is the probability mass going to uncovered in-field segments,
+    weighted by the chance nobody intercepts under the interception model;
+    lower is better. Each step moves one fielder inside the field ellipse
+    and only that fielder's coverage row is recomputed.
+    """
+
+    def __init__(
+        self,
+        config: GameConfig = GameConfig(),
+        batsman: Optional[Batsman] = None,
+        line: int = 4,
+        length: int = 5,
+        aggression: Aggression = Aggression.NEUTRAL,
+        fielders: Optional[Sequence[Point]] = None,
+        fixed: Sequence[int] = (0,),  # wicket-keeper stays put
+        iterations: int = 2000,
+        step: float = 40,
+        initial_temperature: float = 0.05,
+        final_temperature: float = 0.0005
+    ):
+        self.config = config
+        self.batsman = batsman
+        self.line = line
+        self.length = length
+        self.aggression = aggression
+        self.fielders = list(fielders) if fielders is not None else None
+        self.fixed = set(fixed)
+        self.iterations = iterations
+        self.step = step
+        self.initial_temperature = initial_temperature
+        self.final_temperature = final_temperature
+
+    def _make_model(self) -> FieldModel:
+        model = FieldModel(self.config, self.batsman)
+        model.current_delivery_line = self.line
+        model.current_delivery_length = self.length
+        model.aggression_level = self.aggression
+        if self.fielders is not None:
+            model.fielders = list(self.fielders)
+        model._calculate_segment_coverage()
+        return model
+
+    @staticmethod
+    def score(model: FieldModel) -> float:
+        """Probability mass going to uncovered in-field segments
+
+        Slots beyond the boundary are left out: no fielder can cover them, so
+        they would only add a constant to every score.
+        """
+        result = model._update_shot_probabilities()
+        uncovered = result.segment_probabilities * (1 - np.clip(model.shot_coverage, 0, 1))
+        return float(uncovered[model.grid.on_field].sum())
+
+    def run_chain(self, seed: Optional[int] = None, callback: Optional[ImprovementCallback] = None) -> OptimisationResult:
+        """Run a single annealing chain, calling back on every new best"""
+        rng = random.Random(seed)
+        model = self._make_model()
+        movable = [i for i in range(len(model.fielders)) if i not in self.fixed]
+
+        current_score = self.score(model)
+        best_fielders, best_score = list(model.fielders), current_score
+        cooling = (self.final_temperature / self.initial_temperature) ** (1 / max(1, self.iterations))
+        temperature = self.initial_temperature
+
+        for _ in range(self.iterations):
+            index = rng.choice(movable)
+            old_position = model.fielders[index]
+            old_row = model.fielder_coverage[index].copy()
+            old_interception = model.fielder_interception[index].copy() if model.fielder_interception is not None else None
+
+            position = (old_position[0] + rng.gauss(0, self.step), old_position[1] + rng.gauss(0, self.step))
+            if model._inside_field(position):
+                model._move_fielder(index, position)
+                new_score = self.score(model)
+                delta = new_score - current_score
+                if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                    current_score = new_score
+                    if current_score < best_score:
+                        best_fielders, best_score = list(model.fielders), current_score
+                        if callback is not None:
+                            callback(best_fielders, best_score)
+                else:
+                    # Rejected: restore the old row rather than recomputing it
+                    model.fielders[index] = old_position
+                    model.fielder_coverage[index] = old_row
+                    if model.fielder_interception is not None and old_interception is not None:
+                        model.fielder_interception[index] = old_interception
+                    model._apply_fielder_coverage()
+
+            temperature *= cooling
+
+        return OptimisationResult(best_fielders, best_score, self.iterations)
+
+    def optimise(self, chains: int = 4, processes: Optional[int] = None, seed: Optional[int] = None, callback: Optional[ImprovementCallback] = None) -> OptimisationResult:
+        """Run independent chains and keep the best
+
+        Serially the callback sees every improvement as it happens. Over a
+        process pool it sees each chain's best as that chain finishes.
+        """
+        seeds = [None if seed is None else seed + i for i in range(chains)]
+        best: Optional[OptimisationResult] = None
+
+        def consider(result: OptimisationResult):
+            nonlocal best
+            if best is None or result.score < best.score:
+                best = result
+                if callback is not None and processes is not None and processes > 1:
+                    callback(result.fielders, result.score)
+
+        if processes is None or processes <= 1:
+            def report(fielders: List[Point], score: float):
+                if callback is not None and (best is None or score < best.score):
+                    callback(fielders, score)
+            for chain_seed in seeds:
+                consider(self.run_chain(chain_seed, report))
+        else:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                futures = [executor.submit(self.run_chain, chain_seed) for chain_seed in seeds]
+                for future in as_completed(futures):
+                    consider(future.result())
+
+        assert best is not None
+        return best
@@ -0,0 +1,84 @@
+import functools
+import json
+import time
+import numpy as np
+from typing import Any, Callable, Dict, List
+
+class FrameTracer:
+    """Fixed-size ring buffer of timed spans
+
+    Recording a span is a few array stores, so it can wrap every draw call
+    without disturbing what it measures. Once full, the oldest spans are
+    overwritten. Spans nest by time, the way Chrome's trace viewer expects.
+    """
+
+    def __init__(self, capacity: int = 65536):
+        self.capacity = capacity
+        self.names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self.name_ids = np.zeros(capacity, dtype=np.int32)
+        self.starts = np.zeros(capacity)
+        self.durations = np.zeros(capacity)
+        self.count = 0
+        self.origin = time.perf_counter()
+
+    def name_id(self, name: str) -> int:
+        if name not in self._name_ids:
+            self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return self._name_ids[name]
+
+    def record(self, name_id: int, start: float, duration: float):
+        slot = self.count % self.capacity
+        self.name_ids[slot] = name_id
+        self.starts[slot] = start
+        self.durations[slot] = duration
+        self.count += 1
+
+    def wrap(self, name: str, function: Callable) -> Callable:
+        """Time every call of function as a span called name"""
+        name_id = self.name_id(name)
+        clock = time.perf_counter
+
+        @functools.wraps(function)
+        def traced(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name_id, start, clock() - start)
+        return traced
+
+    def _ordered(self) -> np.ndarray:
+        """Slots holding spans, oldest first"""
+        if self.count <= self.capacity:
+            return np.arange(self.count)
+        return (np.arange(self.capacity) + self.count) % self.capacity
+
+    def recent(self, name: str, limit: int) -> np.ndarray:
+        """Durations in seconds of the last limit spans called name"""
+        if name not in self._name_ids:
+            return np.zeros(0)
+        slots = self._ordered()
+        slots = slots[self.name_ids[slots] == self._name_ids[name]]
+        return self.durations[slots[-limit:]]
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Complete events in the Chrome trace event format, timed in microseconds"""
+        slots = self._ordered()
+        events = [
+            {
+                'name': self.names[self.name_ids[slot]],
+                'ph': 'X',
+                'ts': (self.starts[slot] - self.origin) * 1e6,
+                'dur': self.durations[slot] * 1e6,
+                'pid': 1,
+                'tid': 1
+            }
+            for slot in slots
+        ]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, path: str):
+        with open(path, 'w') as handle:
+            json.dump(self.chrome_trace(), handle)
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 @dataclass
 class GameConfig:
@@ -11,4 +12,15 @@ class GameConfig:
     field_height: float = 500
     num_wedges: int = 18  # 20° wedges
     num_zones: int = 7
-    fielder_range: float = 10
\ No newline at end of file
+    zone_spacing: float = 1.0  # above 1 packs zones closer to the bat
+    fielder_range: float = 10
+    background_analysis: bool = True  # recompute off the UI thread while the game runs
+    coverage_model: str = 'disc'  # 'interception' times ball flight against fielder runs
+    probability_cache_size: int = 256  # cached field states
+    idle_timeout_ms: int = 250  # longest wait for input before the watchdog is checked
+    roster_path: Optional[str] = None  # squad to cycle through with B
+    hot_reload: bool = True  # swap analysis modules in place instead of restarting
+    reload_debounce_ms: int = 300  # quiet time after the last save before reloading
+    trace: bool = False  # record frame phases, T shows the frame graph
+    trace_capacity: int = 65536  # spans kept before the oldest are overwritten
+    trace_path: str = 'cricmg2d-trace.json'  # Chrome trace written on exit
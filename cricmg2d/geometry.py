@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from typing import List
 from _types import Point
 
@@ -27,6 +28,32 @@ class GeometryUtils:
 
         return False
 
+    @staticmethod
+    def circle_intersects_polygons(circle_center: Point, radius: float, polygons: np.ndarray) -> np.ndarray:
+        """Vectorised circle_intersects_polygon over an (N, vertices, 2) array of polygons"""
+        cx, cy = circle_center
+        starts = polygons
+        ends = np.roll(polygons, -1, axis=1)
+        x1, y1 = starts[..., 0], starts[..., 1]
+        x2, y2 = ends[..., 0], ends[..., 1]
+
+        # Crossing-number test for the circle center inside each polygon
+        crosses = (y1 > cy) != (y2 > cy)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            xinters = (cy - y1) * (x2 - x1) / (y2 - y1) + x1
+        inside = (crosses & (cx < xinters)).sum(axis=1) % 2 == 1
+
+        # Distance from the center to the closest point on each edge
+        dx, dy = x2 - x1, y2 - y1
+        length_sq = dx * dx + dy * dy
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.where(length_sq > 0, ((cx - x1) * dx + (cy - y1) * dy) / length_sq, 0)
+        t = np.clip(t, 0, 1)
+        dist_sq = (x1 + t * dx - cx) ** 2 + (y1 + t * dy - cy) ** 2
+        near = (dist_sq <= radius * radius).any(axis=1)
+
+        return inside | near
+
     @staticmethod
     def point_inside_polygon(point: Point, polygon: List[Point]) -> bool:
         x, y = point
@@ -0,0 +1,80 @@
+import importlib
+import json
+import os
+import sys
+import types
+from typing import Any, Dict, Iterable, List, Optional
+
+# Modules that can be swapped in a running process, in dependency order
+RELOADABLE = ('geometry', 'testing_data', 'shot_analyzer')
+
+# Where a full restart leaves the field state for the new process to pick up
+STATE_ENV = 'CRICMG2D_STATE'
+
+def loaded_modules(paths: Iterable[str]) -> List[str]:
+    """Names of the imported modules whose source files are among paths
+
+    Files nothing has imported yet are dropped, they need no reload at all.
+    """
+    by_file = {
+        os.path.abspath(module.__file__): name
+        for name, module in list(sys.modules.items())
+        if getattr(module, '__file__', None)
+    }
+    names = {by_file[os.path.abspath(path)] for path in paths if os.path.abspath(path) in by_file}
+    return sorted(names)
+
+def can_reload(names: Iterable[str]) -> bool:
+    return all(name in RELOADABLE for name in names)
+
+def reload_modules(names: Iterable[str]) -> List[str]:
+    """Re-import modules and rebind the names other modules imported from them
+
+    ``from shot_analyzer import ShotAnalyzer`` keeps the old class alive in the
+    importing module, so every module attribute still holding an object of the
+    old version is pointed at its replacement.
+    """
+    requested = set(names)
+    reloaded: List[str] = []
+    for name in RELOADABLE:
+        if name not in requested or name not in sys.modules:
+            continue
+        module = sys.modules[name]
+        old = {key: value for key, value in vars(module).items() if _rebindable(key, value)}
+        importlib.reload(module)
+        replacements = {
+            id(value): getattr(module, key)
+            for key, value in old.items() if hasattr(module, key)
+        }
+        for other in list(sys.modules.values()):
+            if other is module or not _is_local(other):
+                continue
+            for key, value in list(vars(other).items()):
+                if id(value) in replacements and _rebindable(key, value):
+                    setattr(other, key, replacements[id(value)])
+        reloaded.append(name)
+    return reloaded
+
+def _rebindable(key: str, value: Any) -> bool:
+    # Small ints and strings are shared between modules, so only rebind objects with an identity of their own
+    return not key.startswith('__') and isinstance(value, (type, types.FunctionType, dict, list))
+
+def _is_local(module: types.ModuleType) -> bool:
+    path = getattr(module, '__file__', None)
+    return path is not None and os.path.dirname(os.path.abspath(path)) == os.path.dirname(os.path.abspath(__file__))
+
+def save_state(state: Dict[str, Any], path: str):
+    """Write state for a restarted process and point it there through the environment"""
+    with open(path, 'w') as handle:
+        json.dump(state, handle)
+    os.environ[STATE_ENV] = path
+
+def load_state() -> Optional[Dict[str, Any]]:
+    """State left by the process this one replaced, if any"""
+    path = os.environ.pop(STATE_ENV, None)
+    if path is None or not os.path.exists(path):
+        return None
+    with open(path) as handle:
+        state = json.load(handle)
+    os.remove(path)
+    return state
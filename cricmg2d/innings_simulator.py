@@ -0,0 +1,194 @@
+import math
+import numpy as np
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from field_model import FieldModel
+from segments import SegmentGrid
+from _types import Batsman, Length, Line
+
+# Per-ball base rates of the outcomes ShotAnalyzer gives no weight to
+OUT_RATE = 0.03
+MISS_RATE = 0.08
+LEG_BYES_RATE = 0.02
+
+# In-game trait drift per ball, on the 0-100 trait scale
+FATIGUE_PER_BALL = 1.0  # scaled down by stamina
+CONFIDENCE_PER_RUN = 1.5
+CONFIDENCE_PER_DOT = 1.0
+
+BALLS_PER_OVER = 6
+
+# Bowler aims around off stump on a good length by default
+DEFAULT_DELIVERIES: List[Tuple[int, int]] = [
+    (line, length)
+    for line in range(Line.OUTSIDE_OFF, Line.OUTSIDE_LEG + 1)
+    for length in range(Length.BACK_OFF_A_LENGTH, Length.FULL + 1)
+]
+
+class ConfidenceInterval(NamedTuple):
+    mean: float
+    low: float
+    high: float
+
+class InningsSummary(NamedTuple):
+    innings: int
+    balls: int
+    runs: ConfidenceInterval
+    run_rate: ConfidenceInterval  # runs per over
+    wickets: ConfidenceInterval
+    wickets_distribution: Dict[int, ConfidenceInterval]  # share of innings ending on n wickets
+
+    def report(self) -> str:
+        lines = [
+            f"{self.innings} innings, {self.balls} balls simulated",
+            f"Runs: {self.runs.mean:.1f} ({self.runs.low:.1f} - {self.runs.high:.1f})",
+            f"Run rate: {self.run_rate.mean:.2f} ({self.run_rate.low:.2f} - {self.run_rate.high:.2f})",
+            f"Wickets: {self.wickets.mean:.2f} ({self.wickets.low:.2f} - {self.wickets.high:.2f})",
+        ]
+        for wickets, share in self.wickets_distribution.items():
+            lines.append(f"  {wickets} wickets: {share.mean:.3f} ({share.low:.3f} - {share.high:.3f})")
+        return "\n".join(lines)
+
+class InningsSimulator:
+    """Vectorised Monte Carlo innings on top of the shot probability pipeline
+
+    Shot distributions depend only on the field and the delivery, so they are
+    computed once per delivery and sampled through cumulative tables. The
+    trait-dependent outcomes (out, miss, leg byes) are drawn per ball from
+    each innings' current fatigue and confidence.
+    """
+
+    def __init__(self, model: FieldModel, deliveries: Optional[Sequence[Tuple[int, int]]] = None, delivery_weights: Optional[Sequence[float]] = None, batsman: Optional[Batsman] = None):
+        self.model = model
+        self.grid: SegmentGrid = model.grid
+        self.batsman: Batsman = batsman if batsman is not None else model.batsman
+        self.deliveries = list(deliveries) if deliveries is not None else DEFAULT_DELIVERIES
+
+        weights = np.ones(len(self.deliveries)) if delivery_weights is None else np.asarray(delivery_weights, dtype=float)
+        self.delivery_cdf = np.cumsum(weights / weights.sum())
+
+        self.segment_runs = self.runs_per_segment(self.grid, model.shot_coverage)
+        self._build_shot_tables()
+
+    @staticmethod
+    def runs_per_segment(grid: SegmentGrid, coverage: np.ndarray) -> np.ndarray:
+        """Runs scored by a shot landing in each segment
+
+        Beyond the rope is six. Uncovered segments are worth more the further
+        out they lie, reaching four in the boundary zone. Covered segments
+        give a single in the outer half and a dot ball in the inner half.
+        Interception chances count as covered from even odds up.
+        """
+        reach = grid.zone_reach
+        uncovered_runs = np.select([reach <= 2 / 7, reach <= 4 / 7, reach <= 6 / 7], [1, 2, 3], default=4)
+        covered_runs = (reach > 0.5).astype(int)
+        runs = np.where(np.clip(coverage, 0, 1) >= 0.5, covered_runs, uncovered_runs)
+        return np.where(grid.on_field, runs, 6).astype(np.int16)
+
+    def _build_shot_tables(self):
+        """Cumulative shot distributions per delivery, flattened for a single searchsorted"""
+        model = self.model
+        saved = (model.current_delivery_line, model.current_delivery_length, model.aggression_level)
+        model.aggression_level = self.batsman['in_game_traits']['aggression']
+
+        cdfs = np.zeros((len(self.deliveries), self.grid.size))
+        self.has_shot = np.zeros(len(self.deliveries), dtype=bool)
+        for d, (line, length) in enumerate(self.deliveries):
+            model.current_delivery_line = line
+            model.current_delivery_length = length
+            probabilities = model._update_shot_probabilities().segment_probabilities
+            total = probabilities.sum()
+            if total > 0:
+                cdfs[d] = np.cumsum(probabilities / total)
+                self.has_shot[d] = True
+
+        model.current_delivery_line, model.current_delivery_length, model.aggression_level = saved
+        model._update_shot_probabilities()
+
+        # Offsetting row d by d makes every row's values fall in [d, d + 1]
+        cdfs[:, -1] = 1.0
+        self.flat_shot_cdf = (cdfs + np.arange(len(self.deliveries))[:, None]).ravel()
+
+    def _sample_segments(self, delivery: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        positions = np.searchsorted(self.flat_shot_cdf, delivery + rng.random(delivery.size), side='right')
+        return np.minimum(positions - delivery * self.grid.size, self.grid.size - 1)
+
+    def simulate(self, innings: int = 10000, overs: int = 20, max_wickets: int = 10, seed: Optional[int] = None) -> InningsSummary:
+        """Simulate a batch of independent innings ball by ball"""
+        rng = np.random.default_rng(seed)
+        base_traits = self.batsman['base_traits']
+        in_game = self.batsman['in_game_traits']
+
+        skill = (base_traits['timing'] + base_traits['judgement']) / 200
+        aggression_factor = 1 + 0.25 * (in_game['aggression'].value - 3)
+        fatigue_per_ball = FATIGUE_PER_BALL * (1 - base_traits['stamina'] / 100)
+
+        runs = np.zeros(innings, dtype=np.int32)
+        wickets = np.zeros(innings, dtype=np.int32)
+        fatigue = np.full(innings, float(in_game['fatigue']))
+        confidence = np.full(innings, float(in_game['confidence']))
+        balls_faced = np.zeros(innings, dtype=np.int32)
+
+        for _ in range(overs * BALLS_PER_OVER):
+            batting = wickets < max_wickets
+            if not batting.any():
+                break
+            balls_faced += batting
+
+            delivery = np.searchsorted(self.delivery_cdf, rng.random(innings), side='right')
+            delivery = np.minimum(delivery, len(self.deliveries) - 1)
+
+            strain = (1 + fatigue / 100) / (0.5 + skill)
+            p_out = OUT_RATE * aggression_factor * strain * (1 - confidence / 200)
+            p_miss = MISS_RATE * strain
+            outcome = rng.random(innings)
+            out = outcome < p_out
+            missed = ~out & (outcome < p_out + p_miss)
+            leg_byes = ~out & ~missed & (outcome < p_out + p_miss + LEG_BYES_RATE)
+            shot = ~out & ~missed & ~leg_byes & self.has_shot[delivery]
+
+            ball_runs = np.zeros(innings, dtype=np.int32)
+            ball_runs[leg_byes] = 1
+            if shot.any():
+                ball_runs[shot] = self.segment_runs[self._sample_segments(delivery[shot], rng)]
+            ball_runs[~batting] = 0
+            out &= batting
+
+            runs += ball_runs
+            wickets += out
+            fatigue = np.minimum(100, fatigue + fatigue_per_ball)
+            confidence = np.clip(confidence + np.where(ball_runs > 0, ball_runs * CONFIDENCE_PER_RUN, -CONFIDENCE_PER_DOT), 0, 100)
+
+            # A new batsman comes in fresh
+            fatigue[out] = in_game['fatigue']
+            confidence[out] = in_game['confidence']
+
+        return self._summarise(runs, wickets, balls_faced, max_wickets)
+
+    @staticmethod
+    def _mean_interval(samples: np.ndarray, z: float = 1.96) -> ConfidenceInterval:
+        mean = float(samples.mean())
+        half_width = z * float(samples.std(ddof=1)) / math.sqrt(samples.size) if samples.size > 1 else 0.0
+        return ConfidenceInterval(mean, mean - half_width, mean + half_width)
+
+    @staticmethod
+    def _proportion_interval(successes: int, trials: int, z: float = 1.96) -> ConfidenceInterval:
+        """Wilson score interval"""
+        share = successes / trials
+        denominator = 1 + z * z / trials
+        centre = (share + z * z / (2 * trials)) / denominator
+        half_width = z * math.sqrt(share * (1 - share) / trials + z * z / (4 * trials * trials)) / denominator
+        return ConfidenceInterval(share, centre - half_width, centre + half_width)
+
+    def _summarise(self, runs: np.ndarray, wickets: np.ndarray, balls_faced: np.ndarray, max_wickets: int) -> InningsSummary:
+        counts = np.bincount(wickets, minlength=max_wickets + 1)
+        return InningsSummary(
+            innings=runs.size,
+            balls=int(balls_faced.sum()),
+            runs=self._mean_interval(runs),
+            run_rate=self._mean_interval(runs / np.maximum(balls_faced, 1) * BALLS_PER_OVER),
+            wickets=self._mean_interval(wickets),
+            wickets_distribution={
+                n: self._proportion_interval(int(count), runs.size)
+                for n, count in enumerate(counts) if count > 0
+            }
+        )
@@ -0,0 +1,73 @@
+import numpy as np
+from typing import Sequence
+from segments import SegmentGrid
+from _types import Point
+
+# Ground speed of a shot in px/s, rising linearly with its power (its base zone)
+MIN_BALL_SPEED = 40.0
+MAX_BALL_SPEED = 110.0
+
+# Fielder movement in px/s and reaction delay in seconds
+RUN_SPEED = 25.0
+REACTION_TIME = 0.3
+
+# Seconds of margin over which an interception goes from unlikely to likely
+INTERCEPTION_SOFTNESS = 0.15
+
+class InterceptionModel:
+    """Chance that fielders cut off a shot before it lands, from ball and fielder timing
+
+    A shot into segment (w, z) travels along wedge w through zones 0..z at
+    the speed of its power. A fielder intercepts at any segment on that path
+    they can reach before the ball passes it. Per fielder, the margin
+    between the ball's arrival and the fielder's reach time is tabulated for
+    every power and on-field segment. This is the segment x fielder table, one
+    row per fielder, so moving a fielder recomputes only their row.
+    """
+
+    def __init__(self, grid: SegmentGrid, segment_polys: np.ndarray, batsman_pos: Point, catch_radius: float):
+        self.grid = grid
+        self.catch_radius = catch_radius
+
+        # Segment centres in wedge-major order, matching segment_polys
+        self.centres = segment_polys.mean(axis=1)
+        distances = np.hypot(self.centres[:, 0] - batsman_pos[0], self.centres[:, 1] - batsman_pos[1])
+
+        powers = np.arange(int(grid.base_zone_of.max()) + 1)
+        speeds = MIN_BALL_SPEED + (MAX_BALL_SPEED - MIN_BALL_SPEED) * powers / max(1, powers[-1])
+        self.arrival = distances[None, :] / speeds[:, None]  # (powers, on-field segments)
+
+        # Each on-field slot is the landing spot of shots with its base zone's power
+        field = grid.field_indices()
+        self.field_indices = field
+        self.target_power = grid.base_zone_of[field]
+        self.target_wedge = grid.wedge_of[field]
+        self.target_zone = grid.zone_of[field]
+
+    def margins(self, fielder: Point) -> np.ndarray:
+        """Ball arrival minus fielder reach time, shaped (powers, on-field segments)"""
+        gaps = np.hypot(self.centres[:, 0] - fielder[0], self.centres[:, 1] - fielder[1])
+        reach = REACTION_TIME + np.maximum(gaps - self.catch_radius, 0) / RUN_SPEED
+        return self.arrival - reach[None, :]
+
+    def fielder_row(self, fielder: Point) -> np.ndarray:
+        """One fielder's interception chance for a shot landing in each grid slot"""
+        chance = 1 / (1 + np.exp(-self.margins(fielder) / INTERCEPTION_SOFTNESS))
+        chance = chance.reshape(len(chance), self.grid.num_wedges, self.grid.num_zones)
+
+        # Best chance anywhere on the path from the bat out to each zone
+        on_path = np.maximum.accumulate(chance, axis=2)
+        row = np.zeros(self.grid.size)
+        row[self.field_indices] = on_path[self.target_power, self.target_wedge, self.target_zone]
+        return row
+
+    def fielder_rows(self, fielders: Sequence[Point]) -> np.ndarray:
+        rows = np.zeros((len(fielders), self.grid.size))
+        for i, fielder in enumerate(fielders):
+            rows[i] = self.fielder_row(fielder)
+        return rows
+
+    @staticmethod
+    def combine(rows: np.ndarray) -> np.ndarray:
+        """Chance that at least one fielder intercepts, treating fielders as independent"""
+        return 1 - np.prod(1 - rows, axis=0)
@@ -1,10 +1,25 @@
-from cricket_field import CricketField
+import startup_timer
+import sys
 
 def main():
     """Main entry point"""
-    cricket_field = CricketField()
+    from cricket_field import CricketField
+    from game_config import GameConfig
+    startup_timer.mark("imports")
+
+    # The field marks "field geometry" and "first analysis" on the way
+    cricket_field = CricketField(GameConfig(trace="--trace" in sys.argv))
+    startup_timer.mark("field ready")
+
+    # Time to the first frame without entering the event loop
+    if "--startup-time" in sys.argv:
+        cricket_field._present()
+        startup_timer.mark("first frame")
+        print(startup_timer.report())
+        return
+
     cricket_field.run()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,142 @@
+import csv
+import json
+import os
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from segments import SegmentGrid
+from shot_analyzer import ShotAnalyzer
+from _types import Aggression, Batsman, ShotName
+
+# Column order of the trait matrix
+TRAITS = ('timing', 'judgement', 'stamina', 'fatigue', 'confidence', 'aggression')
+
+class Roster:
+    """A squad of batsmen compiled into dense arrays
+
+    ``ratings`` has one row per batsman and one column per ``ShotName.value``
+    (column 0 is padding), the same layout as ShotAnalyzer.rating_vector, so
+    a whole squad can be scored against a field in one call. ``traits`` holds
+    the TRAITS columns with aggression stored as its enum value.
+    """
+
+    def __init__(self, names: Sequence[str], ratings: np.ndarray, traits: np.ndarray):
+        self.names = list(names)
+        self.ratings = ratings
+        self.traits = traits
+        self._index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_batsmen(cls, batsmen: Sequence[Batsman], names: Optional[Sequence[str]] = None) -> 'Roster':
+        names = list(names) if names is not None else [f"Batsman {i + 1}" for i in range(len(batsmen))]
+        ratings = np.zeros((len(batsmen), len(ShotName) + 1), dtype=np.float32)
+        traits = np.zeros((len(batsmen), len(TRAITS)), dtype=np.float32)
+        for i, batsman in enumerate(batsmen):
+            ratings[i] = ShotAnalyzer.rating_vector(batsman)
+            base, in_game = batsman['base_traits'], batsman['in_game_traits']
+            traits[i] = (
+                base['timing'], base['judgement'], base['stamina'],
+                in_game['fatigue'], in_game['confidence'], in_game['aggression'].value
+            )
+        return cls(names, ratings, traits)
+
+    @classmethod
+    def from_json(cls, path: str) -> 'Roster':
+        """Load a list of {"name", "base_traits", "in_game_traits", "shots"} objects keyed by enum names"""
+        with open(path) as handle:
+            records = json.load(handle)
+        batsmen: List[Batsman] = []
+        for record in records:
+            in_game = dict(record['in_game_traits'])
+            in_game['aggression'] = Aggression[in_game['aggression']]
+            batsmen.append({
+                'base_traits': record['base_traits'],
+                'in_game_traits': in_game,
+                'shots': {ShotName[name]: rating for name, rating in record['shots'].items()},
+                'traits': record.get('traits', {})
+            })
+        return cls.from_batsmen(batsmen, [record['name'] for record in records])
+
+    @classmethod
+    def from_csv(cls, path: str) -> 'Roster':
+        """Load one row per batsman with a name column, the TRAITS columns and one column per shot name"""
+        names: List[str] = []
+        ratings_rows: List[np.ndarray] = []
+        traits_rows: List[Tuple[float, ...]] = []
+        with open(path, newline='') as handle:
+            for row in csv.DictReader(handle):
+                names.append(row['name'])
+                ratings = np.zeros(len(ShotName) + 1, dtype=np.float32)
+                for shot in ShotName:
+                    if row.get(shot.name):
+                        ratings[shot.value] = float(row[shot.name])
+                ratings_rows.append(ratings)
+                aggression = row['aggression']
+                aggression_value = int(aggression) if aggression.isdigit() else Aggression[aggression].value
+                traits_rows.append(tuple(float(row[trait]) for trait in TRAITS[:-1]) + (float(aggression_value),))
+        return cls(names, np.array(ratings_rows, dtype=np.float32).reshape(-1, len(ShotName) + 1), np.array(traits_rows, dtype=np.float32).reshape(-1, len(TRAITS)))
+
+    @classmethod
+    def open(cls, path: str) -> 'Roster':
+        """Load a roster from a saved directory, a .json file or a .csv file"""
+        if os.path.isdir(path):
+            return cls.load(path)
+        if path.endswith('.json'):
+            return cls.from_json(path)
+        if path.endswith('.csv'):
+            return cls.from_csv(path)
+        raise ValueError(f"Unrecognised roster file: {path}")
+
+    def save(self, directory: str):
+        """Write the compiled arrays so load() can memory-map them"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'ratings.npy'), self.ratings)
+        np.save(os.path.join(directory, 'traits.npy'), self.traits)
+        with open(os.path.join(directory, 'names.json'), 'w') as handle:
+            json.dump(self.names, handle)
+
+    @classmethod
+    def load(cls, directory: str) -> 'Roster':
+        """Memory-map a roster written by save()"""
+        with open(os.path.join(directory, 'names.json')) as handle:
+            names = json.load(handle)
+        ratings = np.load(os.path.join(directory, 'ratings.npy'), mmap_mode='r')
+        traits = np.load(os.path.join(directory, 'traits.npy'), mmap_mode='r')
+        return cls(names, ratings, traits)
+
+    def index_of(self, name: str) -> int:
+        return self._index[name]
+
+    def batsman(self, index: int) -> Batsman:
+        """Rebuild the Batsman dict for one row, for code that works on single profiles
+
+        Shot ratings stay floats, so fractional ratings in the store survive.
+        """
+        timing, judgement, stamina, fatigue, confidence, aggression = (float(value) for value in self.traits[index])
+        return {
+            'base_traits': {'timing': int(timing), 'judgement': int(judgement), 'stamina': int(stamina)},
+            'in_game_traits': {'fatigue': int(fatigue), 'confidence': int(confidence), 'aggression': Aggression(int(aggression))},
+            'shots': {shot: float(self.ratings[index, shot.value]) for shot in ShotName if self.ratings[index, shot.value] > 0},
+            'traits': {}
+        }
+
+    def score(self, grid: SegmentGrid, coverage: np.ndarray, line: int, length: int, aggression: Optional[Aggression] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Segment probabilities for every batsman against one field
+
+        Uses each batsman's own aggression unless one is given for the whole squad.
+        """
+        judgement = self.traits[:, TRAITS.index('judgement')]
+        if aggression is not None:
+            return ShotAnalyzer.score_batsmen(grid, coverage, line, length, aggression, self.ratings, judgement)
+
+        aggression_values = self.traits[:, TRAITS.index('aggression')].astype(int)
+        probabilities = np.zeros((len(self), grid.size))
+        shot_names = np.zeros(grid.size, dtype=np.int8)
+        for value in np.unique(aggression_values):
+            rows = np.flatnonzero(aggression_values == value)
+            probabilities[rows], shot_names = ShotAnalyzer.score_batsmen(
+                grid, coverage, line, length, Aggression(int(value)), self.ratings[rows], judgement[rows]
+            )
+        return probabilities, shot_names
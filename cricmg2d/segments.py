@@ -0,0 +1,135 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from _types import Power
+
+# ShotData wedges and powers are authored against an 18 wedge x 7 zone field
+BASE_WEDGES = 18
+BASE_ZONES = 7
+
+class SegmentGrid:
+    """Dense integer indexing of wedge/zone segments
+
+    A segment is addressed as ``wedge * zone_slots + zone``. Shot power maps
+    onto base zone index, so powers past the last field zone land beyond
+    the boundary; ``zone_slots`` reserves room for those so every shot has a
+    slot of its own. ``on_field`` marks the slots that have a polygon.
+
+    ``zone_edges`` are the zone boundaries as fractions of the ray from the
+    batsman to the rope, uniform unless given.
+    """
+
+    def __init__(self, num_wedges: int, num_zones: int, zone_edges: Optional[Sequence[float]] = None):
+        self.num_wedges = num_wedges
+        self.num_zones = num_zones
+        self.beyond_zones = int(max(Power)) + 1 - BASE_ZONES
+        self.zone_slots = num_zones + self.beyond_zones
+        self.size = num_wedges * self.zone_slots
+
+        if zone_edges is None:
+            zone_edges = SegmentGrid.spaced_edges(num_zones, 1.0)
+        self.zone_edges = np.asarray(zone_edges, dtype=float)
+        if len(self.zone_edges) != num_zones + 1:
+            raise ValueError(f"Expected {num_zones + 1} zone edges, got {len(self.zone_edges)}")
+
+        indices = np.arange(self.size)
+        self.wedge_of: np.ndarray = indices // self.zone_slots
+        self.zone_of: np.ndarray = indices % self.zone_slots
+        self.on_field: np.ndarray = self.zone_of < num_zones
+
+        # Outer edge of each zone along the ray, past 1 beyond the rope
+        self.zone_reach: np.ndarray = np.where(
+            self.on_field,
+            self.zone_edges[np.minimum(self.zone_of + 1, num_zones)],
+            1 + (self.zone_of - num_zones + 1) / BASE_ZONES
+        )
+
+        # Base zone each slot falls in, so power-based rules keep working on any grid
+        midpoints = (self.zone_edges[:-1] + self.zone_edges[1:]) / 2
+        base_zone_of_field = np.minimum((midpoints * BASE_ZONES).astype(int), BASE_ZONES - 1)
+        self.base_zone_of: np.ndarray = np.where(
+            self.on_field,
+            base_zone_of_field[np.minimum(self.zone_of, num_zones - 1)],
+            BASE_ZONES + self.zone_of - num_zones
+        )
+        self._shot_segments: Dict[Tuple[Tuple[int, ...], int, int], Tuple[np.ndarray, np.ndarray]] = {}
+
+    @staticmethod
+    def spaced_edges(num_zones: int, spacing: float) -> np.ndarray:
+        """Zone edges along the ray; spacing above 1 packs zones closer to the bat"""
+        return (np.arange(num_zones + 1) / num_zones) ** spacing
+
+    def index(self, wedge: int, zone: int) -> int:
+        return wedge * self.zone_slots + zone
+
+    def segment_id(self, index: int) -> str:
+        wedge, zone = divmod(int(index), self.zone_slots)
+        return f"W{wedge}Z{zone}"
+
+    def parse_id(self, segment_id: str) -> Optional[int]:
+        """Index of a ``W{w}Z{z}`` id, or None for special outcomes like OUT
+
+        Raises ValueError for malformed ids or ones outside this grid.
+        """
+        if not segment_id.startswith('W'):
+            return None
+        wedge, zone = (int(part) for part in segment_id[1:].split('Z'))
+        if not (0 <= wedge < self.num_wedges and 0 <= zone < self.zone_slots):
+            raise ValueError(f"segment {segment_id} is outside the grid")
+        return self.index(wedge, zone)
+
+    def field_indices(self) -> np.ndarray:
+        """Indices of on-field segments in wedge-major order"""
+        return np.flatnonzero(self.on_field)
+
+    def wedge_indices(self, wedge: int) -> range:
+        start = wedge * self.zone_slots
+        return range(start, start + self.num_zones)
+
+    def zone_mask(self, zones: Iterable[int]) -> np.ndarray:
+        return np.isin(self.zone_of, list(zones))
+
+    def base_zone_mask(self, zones: Iterable[int]) -> np.ndarray:
+        return np.isin(self.base_zone_of, list(zones))
+
+    def wedges_for_base(self, base_wedge: int) -> List[int]:
+        """Wedges of this grid overlapping one base wedge's angular range"""
+        start = base_wedge * self.num_wedges / BASE_WEDGES
+        end = (base_wedge + 1) * self.num_wedges / BASE_WEDGES
+        return list(range(int(np.floor(start + 1e-9)), int(np.ceil(end - 1e-9))))
+
+    def zones_for_base(self, base_zone: int) -> List[int]:
+        """Zone slots of this grid overlapping one base zone (a shot power level)"""
+        if base_zone >= BASE_ZONES:
+            return [self.num_zones + base_zone - BASE_ZONES]
+        low, high = base_zone / BASE_ZONES, (base_zone + 1) / BASE_ZONES
+        return [
+            z for z in range(self.num_zones)
+            if self.zone_edges[z] < high - 1e-9 and self.zone_edges[z + 1] > low + 1e-9
+        ]
+
+    def base_cell_indices(self, base_wedge: int, base_zone: int) -> np.ndarray:
+        """Indices of this grid covering one base wedge/zone cell"""
+        wedges = np.asarray(self.wedges_for_base(base_wedge), dtype=np.intp)
+        zones = np.asarray(self.zones_for_base(base_zone), dtype=np.intp)
+        return np.add.outer(wedges * self.zone_slots, zones).ravel()
+
+    def shot_segments(self, wedges: Sequence[int], power_min: int, power_max: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices a shot reaches and the share of its rating each one gets
+
+        Each base wedge/power cell splits its rating evenly over the segments
+        of this grid that cover it. A segment spanning several base cells
+        collects a share from each, so every grid keeps the same total per
+        shot. Indices are unique.
+        """
+        key = (tuple(wedges), power_min, power_max)
+        if key not in self._shot_segments:
+            indices: List[np.ndarray] = []
+            shares: List[np.ndarray] = []
+            for wedge in wedges:
+                for power in range(power_min, power_max + 1):
+                    cell = self.base_cell_indices(wedge, power)
+                    indices.append(cell)
+                    shares.append(np.full(cell.size, 1 / max(1, cell.size)))
+            unique, inverse = np.unique(np.concatenate(indices), return_inverse=True)
+            self._shot_segments[key] = (unique, np.bincount(inverse, weights=np.concatenate(shares)))
+        return self._shot_segments[key]
@@ -1,7 +1,19 @@
+import numpy as np
 from typing import Dict, List, Set, Tuple
 from _types import Aggression, Batsman, Segment, ShotData, ShotName
+from segments import SegmentGrid
 from testing_data import shots
 
+# (boosted shots, boosted zones, boost, damped zones, damping) per aggression level
+AGGRESSION_ADJUSTMENTS: Dict[Aggression, Tuple[Tuple[ShotName, ...], Tuple[int, ...], float, Tuple[int, ...], float]] = {
+    Aggression.VERY_DEFENSIVE: ((ShotName.BLOCK, ShotName.TAP), (1, 2, 3), 4, (4, 5, 6, 7), 0.5),
+    Aggression.DEFENSIVE: ((ShotName.BLOCK, ShotName.TAP), (1, 2, 3), 2, (4, 5, 6, 7), 0.75),
+    Aggression.ATTACKING: ((), (5, 6, 7), 2, (1, 2), 0.75),
+    Aggression.VERY_ATTACKING: ((), (5, 6, 7), 4, (1, 2, 3), 0.5),
+}
+
+SPECIAL_OUTCOMES: List[ShotName] = [ShotName.OUT, ShotName.LEAVE, ShotName.MISS, ShotName.LEG_BYES]
+
 class ShotAnalyzer:
     """Handles all shot analysis functionality"""
     
@@ -67,35 +79,19 @@ class ShotAnalyzer:
 
     @staticmethod
     def adjust_potential_shots(segment_shot_values: Dict[str, Tuple[float, ShotName]], aggression: Aggression) -> Dict[str, Tuple[float, ShotName]]:
-        if aggression == Aggression.VERY_DEFENSIVE:
-            for seg_id, (shot_value, shot_name) in segment_shot_values.items():
-                if shot_name in [ShotName.BLOCK, ShotName.TAP] or seg_id.endswith(("Z1", "Z2", "Z3")):
-                    segment_shot_values[seg_id] = (shot_value * 4, shot_name)
-                elif seg_id.endswith(("Z4", "Z5", "Z6", "Z7")):
-                    segment_shot_values[seg_id] = (shot_value * 0.5, shot_name)
-        elif aggression == Aggression.DEFENSIVE:
-            for seg_id, (shot_value, shot_name) in segment_shot_values.items():
-                if shot_name in [ShotName.BLOCK, ShotName.TAP] or seg_id.endswith(("Z1", "Z2", "Z3")):
-                    segment_shot_values[seg_id] = (shot_value * 2, shot_name)
-                elif seg_id.endswith(("Z4", "Z5", "Z6", "Z7")):
-                    segment_shot_values[seg_id] = (shot_value * 0.75, shot_name)
-        elif aggression == Aggression.ATTACKING:
-            for seg_id, (shot_value, shot_name) in segment_shot_values.items():
-                if seg_id.endswith(("Z5", "Z6", "Z7")):
-                    segment_shot_values[seg_id] = (shot_value * 2, shot_name)
-                elif seg_id.endswith(("Z1", "Z2")):
-                    segment_shot_values[seg_id] = (shot_value * 0.75, shot_name)
-        elif aggression == Aggression.VERY_ATTACKING:
+        if aggression in AGGRESSION_ADJUSTMENTS:
+            boost_shots, boost_zones, boost, damp_zones, damping = AGGRESSION_ADJUSTMENTS[aggression]
             for seg_id, (shot_value, shot_name) in segment_shot_values.items():
-                if seg_id.endswith(("Z5", "Z6", "Z7")):
-                    segment_shot_values[seg_id] = (shot_value * 4, shot_name)
-                elif seg_id.endswith(("Z1", "Z2", "Z3")):
-                    segment_shot_values[seg_id] = (shot_value * 0.5, shot_name)
-
-        segment_shot_values['OUT'] = (0, ShotName.OUT)
-        segment_shot_values['LEAVE'] = (0, ShotName.LEAVE)
-        segment_shot_values['MISS'] = (0, ShotName.MISS)
-        segment_shot_values['LEG_BYES'] = (0, ShotName.LEG_BYES)
+                if not seg_id.startswith('W'):
+                    continue
+                zone = int(seg_id.split('Z')[1])
+                if shot_name in boost_shots or zone in boost_zones:
+                    segment_shot_values[seg_id] = (shot_value * boost, shot_name)
+                elif zone in damp_zones:
+                    segment_shot_values[seg_id] = (shot_value * damping, shot_name)
+
+        for outcome in SPECIAL_OUTCOMES:
+            segment_shot_values[outcome.name] = (0, outcome)
         
         return segment_shot_values
 
@@ -107,4 +103,116 @@ class ShotAnalyzer:
         for seg_id, (shot_value, _) in segment_shot_values.items():
             probabilities[seg_id] = shot_value / total_value if total_value > 0 else 0
         
-        return probabilities
\ No newline at end of file
+        return probabilities
+
+    @staticmethod
+    def find_potential_shot_values(grid: SegmentGrid, coverage: np.ndarray, current_delivery_line: int, current_delivery_length: int, batsman: Batsman) -> Tuple[np.ndarray, np.ndarray]:
+        """Array form of find_potential_shots
+
+        Returns ``(values, shot_names)`` indexed by grid segment, where
+        ``shot_names`` holds ``ShotName.value`` and 0 marks segments no shot reaches.
+        """
+        shot_names, shares = ShotAnalyzer.shot_layout(grid, current_delivery_line, current_delivery_length)
+        values = ShotAnalyzer.rating_vector(batsman)[shot_names] * shares
+
+        covered = ShotAnalyzer.covered_share(grid, coverage)
+        batsman_judgement_multiplier: float = 1 + (batsman['base_traits']['judgement'] / 100.0)
+        values *= covered * 0.8 + (1 - covered) * batsman_judgement_multiplier
+        return values, shot_names
+
+    @staticmethod
+    def covered_share(grid: SegmentGrid, coverage: np.ndarray) -> np.ndarray:
+        """How covered each segment is, from 0 (a weak area) to 1
+
+        Fielder counts give exactly 0 or 1, so weak areas are the uncovered
+        segments as before; interception chances blend between the two weights.
+        Segments off the field always count as covered.
+        """
+        return np.where(grid.on_field, np.clip(coverage, 0, 1), 1.0)
+
+    @staticmethod
+    def shot_layout(grid: SegmentGrid, current_delivery_line: int, current_delivery_length: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Which shot reaches each segment for a delivery, and its share of that shot's rating
+
+        Later shots in ``shots`` take over segments earlier shots also reach.
+        """
+        filtered_shots: Dict[ShotName, ShotData] = ShotAnalyzer.get_potential_shots(shots, current_delivery_line, current_delivery_length)
+
+        shot_names = np.zeros(grid.size, dtype=np.int8)
+        shares = np.zeros(grid.size)
+        for shot_name, data in filtered_shots.items():
+            indices, cell_shares = grid.shot_segments(data['wedges'], *data['power'])
+            shot_names[indices] = shot_name.value
+            shares[indices] = cell_shares
+        return shot_names, shares
+
+    @staticmethod
+    def rating_vector(batsman: Batsman) -> np.ndarray:
+        """Shot ratings indexed by ``ShotName.value``, with 0 for index 0 and unrated shots"""
+        ratings = np.zeros(len(ShotName) + 1)
+        for shot_name, rating in batsman['shots'].items():
+            ratings[shot_name.value] = rating
+        return ratings
+
+    @staticmethod
+    def score_batsmen(grid: SegmentGrid, coverage: np.ndarray, current_delivery_line: int, current_delivery_length: int, aggression: Aggression, ratings: np.ndarray, judgement: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Segment probabilities for many batsmen against one field in a single pass
+
+        ``ratings`` is (batsmen, len(ShotName) + 1) laid out like rating_vector and
+        ``judgement`` holds each batsman's judgement trait. Returns the
+        (batsmen, grid.size) probabilities and the shared ``shot_names``.
+        """
+        shot_names, shares = ShotAnalyzer.shot_layout(grid, current_delivery_line, current_delivery_length)
+        values = np.asarray(ratings, dtype=float)[:, shot_names] * shares
+
+        covered = ShotAnalyzer.covered_share(grid, coverage)
+        judgement_multiplier = 1 + np.asarray(judgement, dtype=float)[:, None] / 100.0
+        values *= covered * 0.8 + (1 - covered) * judgement_multiplier
+
+        adjusted = ShotAnalyzer.adjust_shot_values(grid, values, shot_names, aggression)
+        totals = adjusted.sum(axis=1, keepdims=True)
+        probabilities = np.divide(adjusted, totals, out=np.zeros_like(adjusted), where=totals > 0)
+        return probabilities, shot_names
+
+    @staticmethod
+    def adjust_shot_values(grid: SegmentGrid, values: np.ndarray, shot_names: np.ndarray, aggression: Aggression) -> np.ndarray:
+        """Array form of adjust_potential_shots, returns a new value array"""
+        if aggression not in AGGRESSION_ADJUSTMENTS:
+            return values.copy()
+        boost_shots, boost_zones, boost, damp_zones, damping = AGGRESSION_ADJUSTMENTS[aggression]
+        boosted = grid.base_zone_mask(boost_zones) | np.isin(shot_names, [shot.value for shot in boost_shots])
+        damped = ~boosted & grid.base_zone_mask(damp_zones)
+        return values * np.where(boosted, boost, np.where(damped, damping, 1.0))
+
+    @staticmethod
+    def calculate_shot_value_probabilities(values: np.ndarray) -> np.ndarray:
+        """Array form of calculate_potential_shot_probabilities"""
+        total_value = values.sum()
+        if total_value > 0:
+            return values / total_value
+        return np.zeros_like(values)
+
+    @staticmethod
+    def zone_probabilities(grid: SegmentGrid, probabilities: np.ndarray, shot_names: np.ndarray) -> Dict[str, float]:
+        """Sum segment probabilities per zone, for zones any shot reaches"""
+        zone_sums = probabilities.reshape(grid.num_wedges, grid.zone_slots).sum(axis=0)
+        reached = (shot_names.reshape(grid.num_wedges, grid.zone_slots) > 0).any(axis=0)
+        return {str(zone): float(zone_sums[zone]) for zone in np.flatnonzero(reached)}
+
+    @staticmethod
+    def shot_values_to_dict(grid: SegmentGrid, values: np.ndarray, shot_names: np.ndarray) -> Dict[str, Tuple[float, ShotName]]:
+        """Convert shot value arrays to the string-keyed form used for display"""
+        return {
+            grid.segment_id(index): (float(values[index]), ShotName(int(shot_names[index])))
+            for index in np.flatnonzero(shot_names)
+        }
+
+    @staticmethod
+    def probabilities_to_dict(grid: SegmentGrid, probabilities: np.ndarray, shot_names: np.ndarray) -> Dict[str, float]:
+        """Segment probabilities in descending order, followed by the special outcomes"""
+        reached = np.flatnonzero(shot_names)
+        order = reached[np.argsort(-probabilities[reached], kind='stable')]
+        shot_probabilities: Dict[str, float] = {grid.segment_id(index): float(probabilities[index]) for index in order}
+        for outcome in SPECIAL_OUTCOMES:
+            shot_probabilities[outcome.name] = 0.0
+        return shot_probabilities
@@ -0,0 +1,63 @@
+import hashlib
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+from _types import Aggression, Batsman
+
+class ShotProbabilityResult(NamedTuple):
+    """Finished output of the shot probability pipeline for one field state"""
+    shot_values: np.ndarray
+    shot_names: np.ndarray
+    adjusted_shot_values: np.ndarray
+    segment_probabilities: np.ndarray
+    shot_probabilities: Dict[str, float]
+    zones_probabilities: Dict[str, float]
+
+class ShotProbabilityCache:
+    """LRU cache of shot probabilities keyed by a hash of the field state
+
+    Cached results are shared between hits, so callers must treat them as read-only.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, ShotProbabilityResult] = OrderedDict()
+
+    @staticmethod
+    def make_key(coverage: np.ndarray, line: int, length: int, aggression: Aggression, batsman: Batsman) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        coverage = np.ascontiguousarray(coverage)
+        digest.update(coverage.dtype.str.encode())
+        digest.update(coverage.tobytes())
+        ratings = sorted((shot.value, rating) for shot, rating in batsman['shots'].items())
+        traits = sorted(batsman['base_traits'].items())
+        digest.update(repr((line, length, aggression.value, ratings, traits)).encode())
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[ShotProbabilityResult]:
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: bytes, result: ShotProbabilityResult):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> str:
+        return f"hits={self.hits} misses={self.misses} size={len(self._entries)}/{self.maxsize}"
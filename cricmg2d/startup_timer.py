@@ -0,0 +1,15 @@
+import time
+from typing import Dict
+
+# Measured from the first import of this module, so import it before anything heavy
+_start = time.perf_counter()
+_marks: Dict[str, float] = {}
+
+def mark(label: str):
+    """Record the time since start for a label, keeping only its first occurrence"""
+    if label not in _marks:
+        _marks[label] = time.perf_counter() - _start
+
+def report() -> str:
+    """Each label's time since start, in the order they were first reached"""
+    return "\n".join(f"{label}: {seconds * 1000:.1f} ms" for label, seconds in _marks.items())
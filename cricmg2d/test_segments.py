@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+
+from segments import BASE_WEDGES, BASE_ZONES, SegmentGrid
+from testing_data import shots
+
+
+class ShotSegmentsTest(unittest.TestCase):
+    grids = {
+        'base': SegmentGrid(BASE_WEDGES, BASE_ZONES),
+        'fine': SegmentGrid(36, 14),
+        'non-uniform': SegmentGrid(BASE_WEDGES, BASE_ZONES, SegmentGrid.spaced_edges(BASE_ZONES, 1.6)),
+        'coarse': SegmentGrid(9, 4),
+    }
+
+    def test_share_sums_match_base_grid(self):
+        for shot_name, data in shots.items():
+            power_min, power_max = data['power']
+            expected = len(data['wedges']) * (int(power_max) - int(power_min) + 1)
+            for name, grid in self.grids.items():
+                with self.subTest(shot=shot_name.name, grid=name):
+                    _, shares = grid.shot_segments(data['wedges'], *data['power'])
+                    self.assertAlmostEqual(float(shares.sum()), expected)
+
+    def test_indices_are_unique(self):
+        for shot_name, data in shots.items():
+            for name, grid in self.grids.items():
+                with self.subTest(shot=shot_name.name, grid=name):
+                    indices, shares = grid.shot_segments(data['wedges'], *data['power'])
+                    self.assertEqual(len(indices), len(np.unique(indices)))
+                    self.assertEqual(len(indices), len(shares))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,25 +1,99 @@
 import sys
 import os
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
-from watchdog.events import DirModifiedEvent, FileModifiedEvent
+import threading
+import time
+from fnmatch import fnmatch
+from typing import TYPE_CHECKING, List, NamedTuple, Sequence, Set, Tuple
 
-class RestartHandler(FileSystemEventHandler):
-    def __init__(self):
+if TYPE_CHECKING:
+    from watchdog.events import FileSystemEvent
+    from watchdog.observers.api import BaseObserver
+
+# Only the game's own sources are watched, not caches, VCS data or editor scratch files
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+WATCH_PATTERNS = ('*.py',)
+IGNORE_PATTERNS = ('*/__pycache__/*', '*/.*', '*~', '*.swp', '*.swx')
+
+class WatchStats(NamedTuple):
+    watched_paths: int  # directories holding an OS watch
+    events: int  # every event the observer delivered
+    matched: int  # events that passed the patterns
+    events_per_second: float
+
+class RestartHandler:
+    """Collects changed .py files for the game loop to act on
+
+    Implements the watchdog handler interface without subclassing it, so this
+    module imports without pulling in watchdog until watching actually starts.
+    Events arrive on the observer thread, so the pending set is locked.
+    """
+
+    def __init__(self, patterns: Sequence[str] = WATCH_PATTERNS, ignore_patterns: Sequence[str] = IGNORE_PATTERNS):
+        self.patterns = tuple(patterns)
+        self.ignore_patterns = tuple(ignore_patterns)
+        self.watched_paths = 0
         self._modified = False
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._last_event = 0.0
+        self._started = time.monotonic()
+        self._events = 0
+        self._matched = 0
 
-    def on_modified(self, event: DirModifiedEvent | FileModifiedEvent):
-        if str(event.src_path).endswith(".py"):
-            print(f"Detected change in {event.src_path}. Marking for restart.")
+    def matches(self, path: str) -> bool:
+        return (
+            any(fnmatch(path, pattern) for pattern in self.patterns)
+            and not any(fnmatch(path, pattern) for pattern in self.ignore_patterns)
+        )
+
+    def dispatch(self, event: 'FileSystemEvent'):
+        self._events += 1
+        if event.is_directory:
+            return
+        # Editors that save through a temp file show up as a move onto the real path
+        path = str(event.dest_path) if event.event_type == 'moved' else str(event.src_path)
+        if self.matches(path):
+            self._matched += 1
+            self.on_modified(path)
+
+    def on_modified(self, path: str):
+        with self._lock:
+            if path not in self._pending:
+                print(f"Detected change in {path}. Marking for reload.")
             self._modified = True
+            self._pending.add(path)
+            self._last_event = time.monotonic()
     
     def is_modified(self):
         return self._modified
 
-def watch_for_changes():
+    def take_changes(self, quiet_seconds: float) -> List[str]:
+        """Changed paths once no event has arrived for quiet_seconds, so a burst of saves is handled once"""
+        with self._lock:
+            if not self._pending or time.monotonic() - self._last_event < quiet_seconds:
+                return []
+            paths = sorted(self._pending)
+            self._pending.clear()
+            self._modified = False
+            return paths
+
+    def stats(self) -> WatchStats:
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        return WatchStats(self.watched_paths, self._events, self._matched, self._events / elapsed)
+
+def watch_for_changes(path: str = PACKAGE_DIR) -> Tuple['BaseObserver', RestartHandler]:
+    """Watch one source directory, non-recursively, for writes and renames of matching files"""
+    from watchdog.events import FileCreatedEvent, FileModifiedEvent, FileMovedEvent
+    from watchdog.observers import Observer
+
     event_handler = RestartHandler()
     observer = Observer()
-    observer.schedule(event_handler, path=".", recursive=True)
+    # The event filter is applied by the emitter, so other event types never reach the handler
+    observer.schedule(
+        event_handler, path=path, recursive=False,
+        event_filter=[FileModifiedEvent, FileCreatedEvent, FileMovedEvent]
+    )
+    event_handler.watched_paths = 1
     observer.start()
     return observer, event_handler
 
@@ -27,4 +101,4 @@ def restart_program():
     """Restarts the current program."""
     print("Restarting program...")
     python = sys.executable
-    os.execl(python, python, *sys.argv)
\ No newline at end of file
+    os.execl(python, python, *sys.argv)
@@ -2,6 +2,9 @@ import pygame
 import sys
 import random
 import math
+import threading
+import time
+import numpy as np
 
 # initialise pygame
 pygame.init()
@@ -14,6 +17,13 @@ pygame.display.set_caption("Cell Simulation")
 # clock for controlling fps
 clock = pygame.time.Clock()
 
+# world size, larger than the window with --world WIDTHxHEIGHT (e.g. 20000x20000)
+WORLD_WIDTH, WORLD_HEIGHT = WIDTH, HEIGHT
+if '--world' in sys.argv:
+    WORLD_WIDTH, WORLD_HEIGHT = (int(size) for size in sys.argv[sys.argv.index('--world') + 1].lower().split('x'))
+LARGE_WORLD = (WORLD_WIDTH, WORLD_HEIGHT) != (WIDTH, HEIGHT)
+world_scale = WORLD_WIDTH * WORLD_HEIGHT / (WIDTH * HEIGHT)  # entity limits grow with the world's area
+
 # cell properties
 cell_radius = 10
 cell_speed = 1
@@ -22,20 +32,52 @@ direction_change_variance = 30
 max_angle_change = math.pi / 4
 points_to_replicate = 5
 cell_lifetime = 10000  # 5 seconds in milliseconds
-MAX_CELLS = 250
+MAX_CELLS = round(250 * world_scale)
+initial_cells = round(50 * world_scale)
 
 # triangle properties
 triangle_size = 3
 spawn_range = 100
 min_spawn_time = 1000
 max_spawn_time = 5000
-MAX_NUTRIENTS = 1000
+MAX_NUTRIENTS = round(1000 * world_scale)
+initial_triangles = round(100 * world_scale)
+
+# nutrient field properties, used instead of triangles with --nutrient-field
+NUTRIENT_FIELD = '--nutrient-field' in sys.argv
+field_cell_size = max(4, math.ceil(max(WORLD_WIDTH, WORLD_HEIGHT) / 1000))  # pixels per grid cell
+field_capacity = 50.0  # nutrient units a grid cell holds when saturated
+diffusion_rate = 0.1  # share of the neighbour difference that flows per tick
+growth_rate = 0.01  # logistic regrowth per tick
+field_seed_level = 0.05  # regrowth floor, so grazed-out cells can recover
+consumption_rate = 5.0  # units a cell eats per tick from its grid cell
+units_per_point = 50.0  # units eaten per point
+initial_patches = 100
+patch_radius = 6  # grid cells
+
+# with --pipelined, the next tick is simulated on a worker thread while the last one is drawn
+PIPELINED = '--pipelined' in sys.argv
+
+# spatial index: large worlds bucket entities for collisions, frames find what is on screen by tile
+collision_bucket = 4 * cell_radius
+nutrient_bucket = 2 * (cell_radius + triangle_size)
+tile_size = 200  # world pixels per tile, also one pixel of the zoomed-out density map
+tiles_x, tiles_y = math.ceil(WORLD_WIDTH / tile_size), math.ceil(WORLD_HEIGHT / tile_size)
+
+# camera: arrow keys or left-drag pan, mouse wheel zooms
+min_zoom = min(1.0, WIDTH / WORLD_WIDTH, HEIGHT / WORLD_HEIGHT)  # whole world in view
+max_zoom = 4.0
+label_zoom = 0.75  # below this cells lose their point labels
+lod_zoom = 0.25  # below this cells and triangles are drawn as density tiles
+lod_saturation = 20  # entities per tile drawn at full brightness
+pan_speed = 10  # screen pixels per frame
+camera = {'x': WORLD_WIDTH / 2, 'y': WORLD_HEIGHT / 2, 'zoom': 1.0}
 
 def create_cell(x=None, y=None):
     if x is None:
-        x = random.randint(cell_radius, WIDTH - cell_radius)
+        x = random.randint(cell_radius, WORLD_WIDTH - cell_radius)
     if y is None:
-        y = random.randint(cell_radius, HEIGHT - cell_radius)
+        y = random.randint(cell_radius, WORLD_HEIGHT - cell_radius)
     
     angle = random.uniform(0, 2 * math.pi)
     return {
@@ -47,6 +89,7 @@ def create_cell(x=None, y=None):
         'timer': 0,
         'direction_change_interval': base_direction_change_interval + random.randint(-direction_change_variance, direction_change_variance),
         'points': 0,
+        'stored': 0.0,
         'birth_time': pygame.time.get_ticks()
     }
 
@@ -73,8 +116,8 @@ def spawn_nutrient_near(parent):
     distance = random.uniform(0, spawn_range)
     x = parent['x'] + math.cos(angle) * distance
     y = parent['y'] + math.sin(angle) * distance
-    x = max(triangle_size, min(WIDTH - triangle_size, x))
-    y = max(triangle_size, min(HEIGHT - triangle_size, y))
+    x = max(triangle_size, min(WORLD_WIDTH - triangle_size, x))
+    y = max(triangle_size, min(WORLD_HEIGHT - triangle_size, y))
     return create_triangle(x, y)
 
 def check_cell_collision(c1, c2):
@@ -102,28 +145,95 @@ def check_cell_nutrient_collision(cell, nutrient):
     distance = math.sqrt(dx * dx + dy * dy)
     return distance < cell_radius + triangle_size
 
-# Create initial cells and triangles
-cells = [create_cell() for _ in range(50)]
-triangles = [create_triangle(
-    random.randint(triangle_size, WIDTH - triangle_size),
-    random.randint(triangle_size, HEIGHT - triangle_size)
-) for _ in range(100)]
+def create_nutrient_field():
+    rows, cols = WORLD_HEIGHT // field_cell_size, WORLD_WIDTH // field_cell_size
+    field = np.full((rows, cols), field_seed_level, dtype=np.float32)
+    ys, xs = np.ogrid[:rows, :cols]
+    for _ in range(initial_patches):
+        px, py = random.randrange(cols), random.randrange(rows)
+        patch = (xs - px) ** 2 + (ys - py) ** 2 <= patch_radius ** 2
+        field[patch] = field_capacity
+    return field
+
+def update_nutrient_field(field):
+    # Diffusion: 5-point Laplacian convolution with closed (edge-padded) borders
+    padded = np.pad(field, 1, mode='edge')
+    laplacian = padded[:-2, 1:-1] + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:] - 4 * field
+    field += diffusion_rate * laplacian
+    # Logistic regrowth towards capacity
+    np.maximum(field, field_seed_level, out=field)
+    field += growth_rate * field * (1 - field / field_capacity)
+
+def consume_nutrients(field, cells):
+    if not cells:
+        return
+    cols = field.shape[1]
+    xs = np.clip(np.array([cell['x'] for cell in cells]) // field_cell_size, 0, cols - 1).astype(int)
+    ys = np.clip(np.array([cell['y'] for cell in cells]) // field_cell_size, 0, field.shape[0] - 1).astype(int)
+    flat = ys * cols + xs
+
+    # Cells sharing a grid cell split what it holds
+    sharing = np.bincount(flat, minlength=field.size)[flat]
+    eaten = np.minimum(field.ravel()[flat] / sharing, consumption_rate)
+    np.subtract.at(field.ravel(), flat, eaten)
+
+    for cell, amount in zip(cells, eaten):
+        cell['stored'] += float(amount)
+        if cell['stored'] >= units_per_point:
+            gained = int(cell['stored'] // units_per_point)
+            cell['points'] += gained
+            cell['stored'] -= gained * units_per_point
+
+def bucket_of(x, y, size):
+    return int(x // size), int(y // size)
+
+def build_buckets(items, size):
+    buckets = {}
+    for i, item in enumerate(items):
+        buckets.setdefault(bucket_of(item['x'], item['y'], size), []).append(i)
+    return buckets
+
+def nearby(buckets, x, y, size):
+    bx, by = bucket_of(x, y, size)
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            yield from buckets.get((bx + dx, by + dy), ())
+
+def add_nutrient(triangle):
+    triangles.append(triangle)
+    if LARGE_WORLD:
+        nutrient_buckets.setdefault(bucket_of(triangle['x'], triangle['y'], nutrient_bucket), []).append(triangle)
+
+def remove_nutrient(triangle):
+    if LARGE_WORLD:
+        # Leaves its bucket now; the long list is compacted once at the end of the tick
+        nutrient_buckets[bucket_of(triangle['x'], triangle['y'], nutrient_bucket)].remove(triangle)
+        eaten_nutrients.add(id(triangle))
+    else:
+        triangles.remove(triangle)
+
+# Create initial cells and nutrients
+cells = [create_cell() for _ in range(initial_cells)]
+triangles = []
+nutrient_buckets = {}
+eaten_nutrients = set()
+if not NUTRIENT_FIELD:
+    for _ in range(initial_triangles):
+        add_nutrient(create_triangle(
+            random.randint(triangle_size, WORLD_WIDTH - triangle_size),
+            random.randint(triangle_size, WORLD_HEIGHT - triangle_size)
+        ))
+nutrient_field = create_nutrient_field() if NUTRIENT_FIELD else None
 
 # Font for displaying points
 font = pygame.font.Font(None, 20)
 
-running = True
-while running:
-    clock.tick(60)
-    current_time = pygame.time.get_ticks()
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-    
+def simulate_tick(current_time):
     # Process nutrient spawning
+    if nutrient_field is not None:
+        update_nutrient_field(nutrient_field)
     new_triangles = []
-    if len(triangles) < MAX_NUTRIENTS:  # Only spawn if under limit
+    if len(triangles) < MAX_NUTRIENTS and nutrient_field is None:  # Only spawn if under limit
         for triangle in triangles:
             if current_time - triangle['last_spawn_time'] >= triangle['spawn_timer']:
                 new_triangles.append(spawn_nutrient_near(triangle))
@@ -131,11 +241,13 @@ while running:
                 triangle['last_spawn_time'] = current_time
                 if len(triangles) + len(new_triangles) >= MAX_NUTRIENTS:
                     break
-    triangles.extend(new_triangles)
+    for triangle in new_triangles:
+        add_nutrient(triangle)
 
     # Process cells
     cells_to_remove = []
     new_cells = []
+    cell_buckets = build_buckets(cells, collision_bucket) if LARGE_WORLD else None
 
     for i, cell in enumerate(cells):
         # Check cell death
@@ -169,48 +281,337 @@ while running:
         cell['y'] += cell['dy']
 
         # Handle wall collisions
-        if cell['x'] - cell_radius <= 0 or cell['x'] + cell_radius >= WIDTH:
+        if cell['x'] - cell_radius <= 0 or cell['x'] + cell_radius >= WORLD_WIDTH:
             cell['dx'] *= -1
-        if cell['y'] - cell_radius <= 0 or cell['y'] + cell_radius >= HEIGHT:
+        if cell['y'] - cell_radius <= 0 or cell['y'] + cell_radius >= WORLD_HEIGHT:
             cell['dy'] *= -1
 
-        # Check cell-cell collisions
-        for j in range(i + 1, len(cells)):
+        # Check cell-cell collisions, against only the neighbouring buckets in a large world
+        if cell_buckets is not None:
+            neighbours = sorted(j for j in nearby(cell_buckets, cell['x'], cell['y'], collision_bucket) if j > i)
+        else:
+            neighbours = range(i + 1, len(cells))
+        for j in neighbours:
             check_cell_collision(cell, cells[j])
 
         # Check nutrient collisions
-        triangles_to_remove = [t for t in triangles if check_cell_nutrient_collision(cell, t)]
+        if LARGE_WORLD:
+            candidates = list(nearby(nutrient_buckets, cell['x'], cell['y'], nutrient_bucket))
+        else:
+            candidates = triangles
+        triangles_to_remove = [t for t in candidates if check_cell_nutrient_collision(cell, t)]
         if triangles_to_remove:
             cell['points'] += len(triangles_to_remove)
             for triangle in triangles_to_remove:
-                triangles.remove(triangle)
+                remove_nutrient(triangle)
 
-    # Update cell list
-    for cell in cells_to_remove:
-        cells.remove(cell)
+    # Graze the nutrient field under every surviving cell at once
+    removed = {id(cell) for cell in cells_to_remove}
+    if nutrient_field is not None:
+        consume_nutrients(nutrient_field, [cell for cell in cells if id(cell) not in removed])
+
+    # Update cell and nutrient lists
+    if removed:
+        cells[:] = [cell for cell in cells if id(cell) not in removed]
     cells.extend(new_cells)
+    if eaten_nutrients:
+        triangles[:] = [triangle for triangle in triangles if id(triangle) not in eaten_nutrients]
+        eaten_nutrients.clear()
+
+def create_snapshot():
+    return {
+        'cell_positions': np.zeros((MAX_CELLS, 2)),
+        'cell_points': np.zeros(MAX_CELLS, dtype=np.int32),
+        'num_cells': 0,
+        'cell_index': None,
+        'triangle_positions': np.zeros((MAX_NUTRIENTS, 2)),
+        'num_triangles': 0,
+        'triangle_index': None,
+        'field_level': None,
+        'nutrient_units': 0.0
+    }
+
+def build_tile_index(positions):
+    """Entity indices grouped by tile, and where each tile's group starts"""
+    columns = np.clip(positions[:, 0] // tile_size, 0, tiles_x - 1).astype(np.int64)
+    rows = np.clip(positions[:, 1] // tile_size, 0, tiles_y - 1).astype(np.int64)
+    tiles = rows * tiles_x + columns
+    order = np.argsort(tiles, kind='stable')
+    starts = np.searchsorted(tiles[order], np.arange(tiles_x * tiles_y + 1))
+    return order, starts
+
+def query_tiles(index, tile_rect):
+    """Indices of entities in a rectangle of tiles, in their original order"""
+    order, starts = index
+    first_column, first_row, last_column, last_row = tile_rect
+    runs = [
+        order[starts[row * tiles_x + first_column]:starts[row * tiles_x + last_column + 1]]
+        for row in range(first_row, last_row + 1)
+    ]
+    return np.sort(np.concatenate(runs)) if runs else np.zeros(0, dtype=np.int64)
+
+def tile_counts(index, tile_rect):
+    first_column, first_row, last_column, last_row = tile_rect
+    counts = np.diff(index[1]).reshape(tiles_y, tiles_x)
+    return counts[first_row:last_row + 1, first_column:last_column + 1]
+
+def fill_snapshot(snapshot):
+    """Copy what a frame draws out of the simulation state into reused arrays"""
+    num_cells = len(cells)
+    if num_cells > len(snapshot['cell_points']):
+        snapshot['cell_positions'] = np.zeros((num_cells, 2))
+        snapshot['cell_points'] = np.zeros(num_cells, dtype=np.int32)
+    if len(triangles) > len(snapshot['triangle_positions']):
+        snapshot['triangle_positions'] = np.zeros((len(triangles), 2))
+
+    arrays = [snapshot['cell_positions'], snapshot['cell_points'], snapshot['triangle_positions']]
+    for array in arrays:
+        array.flags.writeable = True
+    if cells:
+        snapshot['cell_positions'][:num_cells] = [(cell['x'], cell['y']) for cell in cells]
+        snapshot['cell_points'][:num_cells] = [cell['points'] for cell in cells]
+    if triangles:
+        snapshot['triangle_positions'][:len(triangles)] = [(triangle['x'], triangle['y']) for triangle in triangles]
+    snapshot['num_cells'] = num_cells
+    snapshot['num_triangles'] = len(triangles)
+    snapshot['cell_index'] = build_tile_index(snapshot['cell_positions'][:num_cells])
+    snapshot['triangle_index'] = build_tile_index(snapshot['triangle_positions'][:len(triangles)])
+    arrays += list(snapshot['cell_index']) + list(snapshot['triangle_index'])
+    if nutrient_field is not None:
+        snapshot['field_level'] = np.clip(nutrient_field / field_capacity * 255, 0, 255).astype(np.uint8).T
+        snapshot['nutrient_units'] = float(nutrient_field.sum())
+        arrays.append(snapshot['field_level'])
+    # The renderer only ever reads a published snapshot
+    for array in arrays:
+        array.flags.writeable = False
+
+def clamp_camera():
+    camera['zoom'] = min(max(camera['zoom'], min_zoom), max_zoom)
+    for axis, screen_size, world_size in (('x', WIDTH, WORLD_WIDTH), ('y', HEIGHT, WORLD_HEIGHT)):
+        half_view = screen_size / camera['zoom'] / 2
+        if half_view * 2 >= world_size:
+            camera[axis] = world_size / 2
+        else:
+            camera[axis] = min(max(camera[axis], half_view), world_size - half_view)
+
+def pan_camera(dx, dy):
+    camera['x'] += dx / camera['zoom']
+    camera['y'] += dy / camera['zoom']
+    clamp_camera()
+
+def zoom_camera(factor, anchor):
+    # Keep the world point under the anchor where it is on screen
+    left, top = view_rect()[:2]
+    world_x = left + anchor[0] / camera['zoom']
+    world_y = top + anchor[1] / camera['zoom']
+    camera['zoom'] = min(max(camera['zoom'] * factor, min_zoom), max_zoom)
+    camera['x'] = world_x + (WIDTH / 2 - anchor[0]) / camera['zoom']
+    camera['y'] = world_y + (HEIGHT / 2 - anchor[1]) / camera['zoom']
+    clamp_camera()
+
+def view_rect():
+    half_width, half_height = WIDTH / camera['zoom'] / 2, HEIGHT / camera['zoom'] / 2
+    return camera['x'] - half_width, camera['y'] - half_height, camera['x'] + half_width, camera['y'] + half_height
+
+def visible_tiles(view, margin):
+    left, top, right, bottom = view
+    return (
+        max(int((left - margin) // tile_size), 0),
+        max(int((top - margin) // tile_size), 0),
+        min(int((right + margin) // tile_size), tiles_x - 1),
+        min(int((bottom + margin) // tile_size), tiles_y - 1)
+    )
+
+def to_screen(positions, view):
+    # Truncate towards zero, as int() does
+    return ((positions - view[:2]) * camera['zoom']).astype(np.int32)
+
+def draw_nutrient_level(level, surface, view):
+    # Only the part of the grid inside the view is coloured and scaled
+    left, top, right, bottom = view
+    columns, rows = level.shape
+    first_column, last_column = max(int(left // field_cell_size), 0), min(math.ceil(right / field_cell_size), columns)
+    first_row, last_row = max(int(top // field_cell_size), 0), min(math.ceil(bottom / field_cell_size), rows)
+    if first_column >= last_column or first_row >= last_row:
+        return
+    visible = level[first_column:last_column, first_row:last_row]
+    pixels = np.zeros(visible.shape + (3,), dtype=np.uint8)
+    pixels[..., 0] = visible
+    pixels[..., 1] = visible
+    small = pygame.surfarray.make_surface(pixels)
+    size = (
+        round((last_column - first_column) * field_cell_size * camera['zoom']),
+        round((last_row - first_row) * field_cell_size * camera['zoom'])
+    )
+    position = (
+        round((first_column * field_cell_size - left) * camera['zoom']),
+        round((first_row * field_cell_size - top) * camera['zoom'])
+    )
+    surface.blit(pygame.transform.scale(small, size), position)
+
+def draw_density_tiles(snapshot, surface, view):
+    """Zoomed out: one pixel per tile, red for cells and yellow for triangles, scaled up"""
+    tile_rect = visible_tiles(view, 0)
+    cell_level = np.minimum(tile_counts(snapshot['cell_index'], tile_rect) * (255 / lod_saturation), 255)
+    triangle_level = np.minimum(tile_counts(snapshot['triangle_index'], tile_rect) * (255 / lod_saturation), 255)
+    pixels = np.zeros(cell_level.T.shape + (3,), dtype=np.uint8)
+    pixels[..., 0] = np.maximum(cell_level, triangle_level).T
+    pixels[..., 1] = triangle_level.T
+    small = pygame.surfarray.make_surface(pixels)
+    small.set_colorkey((0, 0, 0))  # empty tiles leave the nutrient field visible
+    first_column, first_row, last_column, last_row = tile_rect
+    size = (
+        round((last_column - first_column + 1) * tile_size * camera['zoom']),
+        round((last_row - first_row + 1) * tile_size * camera['zoom'])
+    )
+    position = to_screen(np.array([first_column * tile_size, first_row * tile_size]), view).tolist()
+    surface.blit(pygame.transform.scale(small, size), position)
+
+triangle_offsets = np.array([
+    (triangle_size * math.cos(i * 2 * math.pi / 3), triangle_size * math.sin(i * 2 * math.pi / 3)) for i in range(3)
+])
+
+def draw_snapshot(snapshot):
+    view = view_rect()
+    zoom = camera['zoom']
 
     # Draw everything
     screen.fill((0, 0, 0))
+    if snapshot['field_level'] is not None:
+        draw_nutrient_level(snapshot['field_level'], screen, view)
 
     # Draw entity counts
-    counts_text = f"Cells: {len(cells)}/{MAX_CELLS} Nutrients: {len(triangles)}/{MAX_NUTRIENTS}"
+    if snapshot['field_level'] is not None:
+        counts_text = f"Cells: {snapshot['num_cells']}/{MAX_CELLS} Nutrients: {snapshot['nutrient_units']:,.0f} units"
+    else:
+        counts_text = f"Cells: {snapshot['num_cells']}/{MAX_CELLS} Nutrients: {snapshot['num_triangles']}/{MAX_NUTRIENTS}"
+    if LARGE_WORLD:
+        counts_text += f" Zoom: {zoom:.2f}x"
     counts_surface = font.render(counts_text, True, (255, 255, 255))
     screen.blit(counts_surface, (10, 10))
-    
-    # Draw triangles
-    for triangle in triangles:
-        pygame.draw.polygon(screen, (255, 255, 0), triangle['vertices'])
-    
-    # Draw cells and their points
-    for cell in cells:
-        pygame.draw.circle(screen, (255, 0, 0), (int(cell['x']), int(cell['y'])), cell_radius)
-        points_text = str(cell['points'])
-        text_surface = font.render(points_text, True, (255, 255, 255))
-        text_rect = text_surface.get_rect(center=(int(cell['x']), int(cell['y'])))
-        screen.blit(text_surface, text_rect)
-    
+
+    if zoom < lod_zoom:
+        draw_density_tiles(snapshot, screen, view)
+        pygame.display.flip()
+        return
+
+    # Draw triangles on screen
+    visible = query_tiles(snapshot['triangle_index'], visible_tiles(view, triangle_size))
+    centres = snapshot['triangle_positions'][visible]
+    vertices = (centres[:, None, :] + triangle_offsets).astype(np.int32)  # as create_triangle_vertices
+    for polygon in to_screen(vertices, view).tolist():
+        pygame.draw.polygon(screen, (255, 255, 0), polygon)
+
+    # Draw cells on screen and their points
+    visible = query_tiles(snapshot['cell_index'], visible_tiles(view, cell_radius))
+    positions = to_screen(snapshot['cell_positions'][visible], view).tolist()
+    points = snapshot['cell_points'][visible].tolist()
+    radius = max(int(cell_radius * zoom), 1)
+    for position, cell_points in zip(positions, points):
+        pygame.draw.circle(screen, (255, 0, 0), position, radius)
+        if zoom >= label_zoom:
+            text_surface = font.render(str(cell_points), True, (255, 255, 255))
+            text_rect = text_surface.get_rect(center=position)
+            screen.blit(text_surface, text_rect)
+
     pygame.display.flip()
 
+# Double buffer: the renderer draws snapshots[front] while the simulation fills the other one
+snapshots = [create_snapshot(), create_snapshot()]
+front = 0
+tick_requested = threading.Event()
+tick_done = threading.Event()
+requested_time = 0
+simulation_seconds = 0.0
+simulation_error = None
+
+def simulation_worker():
+    global simulation_seconds, simulation_error
+    while True:
+        tick_requested.wait()
+        tick_requested.clear()
+        if not running:
+            return
+        start = time.perf_counter()
+        try:
+            simulate_tick(requested_time)
+            fill_snapshot(snapshots[1 - front])
+        except Exception as error:
+            # Handed to the main thread, which re-raises it instead of waiting forever
+            simulation_error = error
+            return
+        finally:
+            simulation_seconds += time.perf_counter() - start
+            tick_done.set()
+
+def wait_for_tick():
+    tick_done.wait()
+    if simulation_error is not None:
+        raise simulation_error
+
+def report_pipeline(frames, render_seconds, frame_seconds):
+    # Whatever the two stages took beyond the frame's wall time ran side by side
+    overlap = max(simulation_seconds + render_seconds - frame_seconds, 0.0)
+    shorter = min(simulation_seconds, render_seconds)
+    print(
+        f"Pipeline: {frames} frames, simulation {simulation_seconds / frames * 1000:.2f} ms, "
+        f"render {render_seconds / frames * 1000:.2f} ms, frame {frame_seconds / frames * 1000:.2f} ms, "
+        f"overlapped {overlap / frames * 1000:.2f} ms ({overlap / shorter * 100 if shorter else 0:.0f}% of the shorter stage)"
+    )
+
+running = True
+for snapshot in snapshots:
+    fill_snapshot(snapshot)
+if PIPELINED:
+    simulation_thread = threading.Thread(target=simulation_worker, name="simulation", daemon=True)
+    simulation_thread.start()
+    tick_done.set()
+frames = 0
+render_seconds = frame_seconds = 0.0
+
+while running:
+    clock.tick(60)
+    current_time = pygame.time.get_ticks()
+
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            running = False
+        elif event.type == pygame.MOUSEWHEEL:
+            zoom_camera(1.25 ** event.y, pygame.mouse.get_pos())
+        elif event.type == pygame.MOUSEMOTION and event.buttons[0]:
+            pan_camera(-event.rel[0], -event.rel[1])
+    keys = pygame.key.get_pressed()
+    pan_x = (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * pan_speed
+    pan_y = (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * pan_speed
+    if pan_x or pan_y:
+        pan_camera(pan_x, pan_y)
+
+    if not PIPELINED:
+        simulate_tick(current_time)
+        fill_snapshot(snapshots[front])
+        draw_snapshot(snapshots[front])
+        continue
+    if not running:
+        break
+
+    # Publish the tick that just finished, start the next and draw the published one meanwhile
+    frame_start = time.perf_counter()
+    wait_for_tick()
+    tick_done.clear()
+    front = 1 - front
+    requested_time = current_time
+    tick_requested.set()
+    draw_snapshot(snapshots[front])
+    render_seconds += time.perf_counter() - frame_start
+    wait_for_tick()
+    frame_seconds += time.perf_counter() - frame_start
+    frames += 1
+
+if PIPELINED:
+    tick_requested.set()
+    simulation_thread.join()
+    if frames:
+        report_pipeline(frames, render_seconds, frame_seconds)
+
 pygame.quit()
-sys.exit()
\ No newline at end of file
+sys.exit()